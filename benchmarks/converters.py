@@ -0,0 +1,72 @@
+"""
+Measures the time for converting numpy arrays and pandas DataFrames into Weka Instances and back.
+Requires an ADAMS installation (e.g., obtained via pa-download).
+
+Usage:
+
+    python benchmarks/converters.py /some/where/adams [num_rows] [num_columns]
+"""
+import sys
+import time
+
+import pyadams.core.jvm as jvm
+
+REPETITIONS = 5
+""" the number of repetitions per conversion, the best time gets reported. """
+
+
+def best_of(func, *args) -> float:
+    """
+    Executes the function repeatedly and returns the best time.
+
+    :param func: the function to execute
+    :param args: the arguments for the function
+    :return: the best time in seconds
+    :rtype: float
+    """
+    result = None
+    for i in range(REPETITIONS):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        if (result is None) or (elapsed < result):
+            result = elapsed
+    return result
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    num_rows = int(sys.argv[2]) if (len(sys.argv) > 2) else 100000
+    num_columns = int(sys.argv[3]) if (len(sys.argv) > 3) else 20
+    jvm.start(sys.argv[1], headless=True)
+    try:
+        import numpy as np
+        import pandas as pd
+        from pyadams.core.converters import ndarray_to_instances, instances_to_ndarray, \
+            dataframe_to_instances, instances_to_dataframe
+
+        data = np.random.default_rng(1).random((num_rows, num_columns))
+        df = pd.DataFrame(data, columns=["att-%d" % (i + 1) for i in range(num_columns)])
+        df["nominal"] = pd.Series(np.where(data[:, 0] < 0.5, "a", "b"))
+        df["date"] = pd.Timestamp("2020-01-01") + pd.to_timedelta(np.arange(num_rows), unit="s")
+
+        # warm up
+        ndarray_to_instances(data[:1000])
+
+        inst = ndarray_to_instances(data)
+        print("rows=%d, columns=%d" % (num_rows, num_columns))
+        print("ndarray_to_instances    %8.3f s" % best_of(ndarray_to_instances, data))
+        print("instances_to_ndarray    %8.3f s" % best_of(instances_to_ndarray, inst))
+        inst = dataframe_to_instances(df)
+        print("dataframe_to_instances  %8.3f s" % best_of(dataframe_to_instances, df))
+        print("instances_to_dataframe  %8.3f s" % best_of(instances_to_dataframe, inst))
+        if not instances_to_dataframe(inst).equals(df.astype({"nominal": "category"})):
+            raise Exception("DataFrame round trip is not symmetric!")
+    finally:
+        jvm.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Checks that importing the tools and the flow package stays lightweight: the modules get
+imported in fresh interpreters, which must not load JPype, and the median import time must
+stay within the budget. Exits with a non-zero code if either check fails.
+
+Usage:
+
+    python benchmarks/import_time.py [budget_seconds] [repetitions]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+BUDGET = 0.5
+""" the default budget in seconds for importing the modules. """
+
+REPETITIONS = 5
+""" the default number of fresh interpreters to measure. """
+
+MODULES = ["pyadams.tool.download", "pyadams.flow"]
+""" the modules to import. """
+
+CODE = """
+import sys
+import time
+start = time.perf_counter()
+%s
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(",".join(sorted(m for m in sys.modules if m.split(".")[0].startswith("jpype") or m.startswith("_jpype"))))
+""" % "\n".join("import %s" % m for m in MODULES)
+
+
+def measure() -> tuple:
+    """
+    Imports the modules in a fresh interpreter.
+
+    :return: the elapsed time in seconds and the list of loaded JPype modules
+    :rtype: tuple
+    """
+    env = dict(os.environ)
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env["PYTHONPATH"] = src + ((os.pathsep + env["PYTHONPATH"]) if ("PYTHONPATH" in env) else "")
+    output = subprocess.check_output([sys.executable, "-c", CODE], env=env, universal_newlines=True)
+    lines = output.strip().split("\n")
+    loaded = [x for x in lines[1].split(",") if len(x) > 0] if (len(lines) > 1) else []
+    return float(lines[0]), loaded
+
+
+def main():
+    budget = float(sys.argv[1]) if (len(sys.argv) > 1) else BUDGET
+    repetitions = int(sys.argv[2]) if (len(sys.argv) > 2) else REPETITIONS
+    times = []
+    for i in range(repetitions):
+        elapsed, loaded = measure()
+        if len(loaded) > 0:
+            print("FAILED: JPype modules loaded on import: %s" % ", ".join(loaded))
+            sys.exit(1)
+        times.append(elapsed)
+    median = statistics.median(times)
+    print("import %s: median=%.3fs, min=%.3fs, budget=%.3fs" % (", ".join(MODULES), median, min(times), budget))
+    if median > budget:
+        print("FAILED: import time exceeds budget")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Measures the per-token overhead of PythonTransformer with and without batching, checking that
+all tokens (including the ones of the final incomplete batch) get processed.
+Requires an ADAMS installation (e.g., obtained via pa-download).
+
+Usage:
+
+    python benchmarks/python_transformer.py /some/where/adams [num_tokens]
+"""
+import sys
+import time
+
+import pyadams.core.jvm as jvm
+
+BATCH_SIZES = [1, 10, 100, 1000]
+
+
+def run(num_tokens: int, batch_size: int) -> float:
+    """
+    Executes a flow that pushes the integers through an identity PythonTransformer.
+
+    :param num_tokens: the number of tokens to generate
+    :type num_tokens: int
+    :param batch_size: the batch size of the transformer
+    :type batch_size: int
+    :return: the time per token in microseconds
+    :rtype: float
+    """
+    from jpype import JClass
+    from pyadams.flow import Actor, PythonTransformer
+
+    class Identity(PythonTransformer):
+        def process(self, items):
+            return items
+
+    flow = Actor(classname="adams.flow.control.Flow")
+    source = JClass("adams.flow.source.ForLoop")()
+    source.setLoopUpper(num_tokens)
+    transformer = Identity(batch_size=batch_size)
+    flow.jobject.add(source)
+    flow.jobject.add(transformer.to_actor().jobject)
+    flow.jobject.add(JClass("adams.flow.sink.Null")())
+    with flow:
+        msg = flow.set_up()
+        if msg is not None:
+            raise Exception(msg)
+        start = time.perf_counter()
+        msg = flow.execute()
+        elapsed = time.perf_counter() - start
+        if msg is not None:
+            raise Exception(msg)
+    transformer.clean_up()
+    if transformer.processed != num_tokens:
+        raise Exception("Only %d out of %d tokens were processed!" % (transformer.processed, num_tokens))
+    return elapsed / num_tokens * 1e6
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    num_tokens = int(sys.argv[2]) if (len(sys.argv) > 2) else 100000
+    jvm.start(sys.argv[1], headless=True)
+    try:
+        # warm up
+        run(min(num_tokens, 1000), 1)
+        print("batch_size  us/token")
+        for batch_size in BATCH_SIZES:
+            print("%10d  %8.2f" % (batch_size, run(num_tokens, batch_size)))
+    finally:
+        jvm.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compares handing numpy arrays to worker processes via SharedArray against pickling them,
+using a process pool. Does not require ADAMS.
+
+Usage:
+
+    python benchmarks/shm_vs_pickle.py [megabytes] [num_tasks]
+"""
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pyadams.core.shm import SharedArray
+
+WORKERS = 4
+""" the number of worker processes. """
+
+
+def work_pickled(array) -> float:
+    """
+    Sums up the pickled array.
+
+    :param array: the numpy array
+    :return: the sum
+    :rtype: float
+    """
+    return float(array.sum())
+
+
+def work_shared(descriptor) -> float:
+    """
+    Attaches to the shared array and sums it up.
+
+    :param descriptor: the descriptor of the shared array
+    :type descriptor: dict
+    :return: the sum
+    :rtype: float
+    """
+    with SharedArray.attach(descriptor) as shared:
+        return float(shared.array.sum())
+
+
+def run(pool: ProcessPoolExecutor, func, arg, num_tasks: int) -> float:
+    """
+    Submits the tasks to the pool and waits for them to finish.
+
+    :param pool: the pool to use
+    :type pool: ProcessPoolExecutor
+    :param func: the function to execute
+    :param arg: the argument for the function
+    :param num_tasks: the number of tasks to submit
+    :type num_tasks: int
+    :return: the time in seconds
+    :rtype: float
+    """
+    start = time.perf_counter()
+    futures = [pool.submit(func, arg) for _ in range(num_tasks)]
+    for future in futures:
+        future.result()
+    return time.perf_counter() - start
+
+
+def main():
+    megabytes = int(sys.argv[1]) if (len(sys.argv) > 1) else 100
+    num_tasks = int(sys.argv[2]) if (len(sys.argv) > 2) else 20
+    data = np.random.default_rng(1).random(megabytes * 1024 * 1024 // 8)
+    with ProcessPoolExecutor(max_workers=WORKERS) as pool:
+        # warm up, i.e., start the workers
+        run(pool, work_pickled, data[:10], WORKERS)
+        pickled = run(pool, work_pickled, data, num_tasks)
+        # includes the one copy into the shared memory
+        start = time.perf_counter()
+        with SharedArray.from_array(data) as shared:
+            run(pool, work_shared, shared.descriptor, num_tasks)
+        shared_time = time.perf_counter() - start
+    print("size=%dMB, tasks=%d, workers=%d" % (megabytes, num_tasks, WORKERS))
+    print("pickle       %8.3f s" % pickled)
+    print("SharedArray  %8.3f s" % shared_time)
+    print("speedup      %8.1fx" % (pickled / shared_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -33,7 +33,7 @@ setup(
         "pyadams",
         "pyadams.core",
         "pyadams.flow",
-        "pyadams.tools",
+        "pyadams.tool",
     ],
     version="0.0.1",
     author='Peter "fracpete" Reutemann',
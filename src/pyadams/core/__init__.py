@@ -1 +1,12 @@
-from ._messagecollection import MessageCollection
+def __getattr__(name):
+    """
+    Imports the JPype-based classes only on first access, to keep "import pyadams.core" lightweight.
+
+    :param name: the name of the attribute to retrieve
+    :type name: str
+    :return: the attribute
+    """
+    if name == "MessageCollection":
+        from ._messagecollection import MessageCollection
+        return MessageCollection
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -1,21 +1,84 @@
 import traceback
 
-from jpype import JClass
+from jpype import JClass, JString
 from pyadams.core.classes import JavaObject
 from typing import Union, List
 
+PAGE_SIZE = 1000
+""" the default number of messages to retrieve from the JVM at a time. """
+
+_LIST_FIELDS = dict()
+""" caches the field holding the messages per Java class. """
+
+
+def _list_field(jobject):
+    """
+    Locates the java.util.List field that adams.core.MessageCollection (or a subclass)
+    stores its messages in and makes it accessible.
+
+    :param jobject: the message collection to inspect
+    :return: the field
+    """
+    cls = jobject.getClass()
+    name = str(cls.getName())
+    if name not in _LIST_FIELDS:
+        list_cls = JClass("java.util.List").class_
+        field = None
+        while (field is None) and (cls is not None):
+            for f in cls.getDeclaredFields():
+                if list_cls.isAssignableFrom(f.getType()):
+                    f.setAccessible(True)
+                    field = f
+                    break
+            cls = cls.getSuperclass()
+        if field is None:
+            raise Exception("Failed to locate list of messages in: %s" % name)
+        _LIST_FIELDS[name] = field
+    return _LIST_FIELDS[name]
+
 
 class MessageCollection(JavaObject):
 
-    def __init__(self, jobject=None):
+    def __init__(self, jobject=None, page_size: int = PAGE_SIZE):
         """
         Initializes the message collection.
 
         :param jobject: the object to wrap, creates a new instance if None
+        :param page_size: the number of messages to retrieve from the JVM at a time
+        :type page_size: int
         """
         if jobject is None:
             jobject = JClass("adams.core.MessageCollection")()
         super().__init__(jobject)
+        if page_size < 1:
+            raise Exception("Page size must be at least 1: %d" % page_size)
+        self.page_size = page_size
+
+    def _messages(self):
+        """
+        Returns the Java list holding the messages. No messages get cached on the Python side,
+        as the collection can be modified by the flow at any time; each call retrieves a fresh
+        snapshot instead.
+
+        :return: the java.util.List
+        """
+        return _list_field(self.jobject).get(self.jobject)
+
+    def _range(self, jlist, start: int, end: int) -> List[str]:
+        """
+        Retrieves the messages in the specified range with a single call.
+
+        :param jlist: the Java list to retrieve the messages from
+        :param start: the first index (incl)
+        :type start: int
+        :param end: the last index (excl)
+        :type end: int
+        :return: the messages
+        :rtype: list
+        """
+        if start >= end:
+            return []
+        return [str(x) for x in jlist.subList(start, end).toArray()]
 
     def clear(self):
         """
@@ -25,7 +88,8 @@ class MessageCollection(JavaObject):
 
     def add(self, msg: Union[str, List[str]]):
         """
-        Adds the message(s) to its internal list.
+        Adds the message(s) to its internal list. Multiple messages get transferred
+        to the JVM in a single call.
 
         :param msg: the message(s) to add
         :type msg: str or list
@@ -33,8 +97,11 @@ class MessageCollection(JavaObject):
         if isinstance(msg, str):
             self.jobject.add(msg)
         else:
-            for s in msg:
-                self.jobject.add(s)
+            msgs = [str(x) for x in msg]
+            if len(msgs) == 1:
+                self.jobject.add(msgs[0])
+            elif len(msgs) > 1:
+                self._messages().addAll(JClass("java.util.Arrays").asList(JString[:](msgs)))
 
     def add_exc(self, msg: str):
         """
@@ -45,6 +112,15 @@ class MessageCollection(JavaObject):
         """
         self.add(msg + "\n" + traceback.format_exc())
 
+    def to_list(self) -> List[str]:
+        """
+        Returns all the messages.
+
+        :return: the messages
+        :rtype: list
+        """
+        return list(self)
+
     def __len__(self):
         """
         Returns the number of stored messages.
@@ -53,3 +129,41 @@ class MessageCollection(JavaObject):
         :rtype: int
         """
         return self.jobject.size()
+
+    def __getitem__(self, index: Union[int, slice]):
+        """
+        Returns the message(s) at the specified index/slice.
+
+        :param index: the index or slice
+        :type index: int or slice
+        :return: the message(s)
+        :rtype: str or list
+        """
+        jlist = self._messages()
+        size = jlist.size()
+        if isinstance(index, slice):
+            start, stop, step = index.indices(size)
+            if step < 0:
+                return self._range(jlist, stop + 1, start + 1)[::step]
+            return self._range(jlist, start, stop)[::step]
+        if index < 0:
+            index += size
+        if (index < 0) or (index >= size):
+            raise IndexError("Index out of range: %d" % index)
+        return str(jlist.get(index))
+
+    def __iter__(self):
+        """
+        Iterates over the messages, retrieving them from the JVM page by page.
+
+        :return: the iterator
+        """
+        jlist = self._messages()
+        start = 0
+        while True:
+            page = self._range(jlist, start, min(start + self.page_size, jlist.size()))
+            if len(page) == 0:
+                break
+            for s in page:
+                yield s
+            start += len(page)
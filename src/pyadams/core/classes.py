@@ -1,6 +1,23 @@
 import inspect
+import json
+import logging
+import os
+import struct
+import threading
+import zipfile
+from typing import Dict, List, Optional
 
-from jpype import JClass, JException, JObject
+_logger = logging.getLogger(__name__)
+
+ACC_PUBLIC = 0x0001
+ACC_INTERFACE = 0x0200
+ACC_ABSTRACT = 0x0400
+
+_class_indices = dict()
+""" the loaded class indices: fingerprint -> (index, subtypes). """
+
+_index_lock = threading.Lock()
+""" for synchronizing access to the class indices. """
 
 
 def get_classname(obj):
@@ -12,6 +29,7 @@ def get_classname(obj):
     :return: the classname
     :rtype: str
     """
+    from jpype import JObject
     if isinstance(obj, JavaObject):
         obj = obj.jobject
     if isinstance(obj, JObject):
@@ -33,6 +51,7 @@ def is_instance_of(obj, class_or_intf_name):
     :return: true if either implements interface or subclass of superclass
     :rtype: bool
     """
+    from jpype import JClass
     if isinstance(obj, JavaObject):
         obj = obj.jobject
     classname = get_classname(obj)
@@ -170,6 +189,7 @@ class JavaObject:
         :return: the Java object
         :rtype: JPype object
         """
+        from jpype import JClass, JException
         try:
             if options is None:
                 options = []
@@ -177,3 +197,245 @@ class JavaObject:
         except JException as e:
             print("Failed to instantiate " + classname + ": " + str(e))
             return None
+
+
+def parse_class_file(data: bytes) -> Dict:
+    """
+    Parses the header of the Java class file (up to the implemented interfaces), without the JVM.
+
+    :param data: the content of the class file
+    :type data: bytes
+    :return: the class information (keys: name, super, interfaces, public, interface, abstract)
+    :rtype: dict
+    """
+    if data[:4] != b"\xca\xfe\xba\xbe":
+        raise Exception("Not a Java class file!")
+    count = struct.unpack_from(">H", data, 8)[0]
+    pos = 10
+    utf8 = dict()
+    classes = dict()
+    i = 1
+    while i < count:
+        tag = data[pos]
+        if tag == 1:
+            length = struct.unpack_from(">H", data, pos + 1)[0]
+            utf8[i] = data[pos + 3:pos + 3 + length].decode("utf-8", errors="replace")
+            pos += 3 + length
+        elif tag == 7:
+            classes[i] = struct.unpack_from(">H", data, pos + 1)[0]
+            pos += 3
+        elif tag in (8, 16, 19, 20):
+            pos += 3
+        elif tag == 15:
+            pos += 4
+        elif tag in (3, 4, 9, 10, 11, 12, 17, 18):
+            pos += 5
+        elif tag in (5, 6):
+            # long/double occupy two entries
+            pos += 9
+            i += 1
+        else:
+            raise Exception("Unknown constant pool tag %d at offset %d!" % (tag, pos))
+        i += 1
+
+    def class_name(index: int) -> Optional[str]:
+        if index == 0:
+            return None
+        return utf8[classes[index]].replace("/", ".")
+
+    access, this_class, super_class, num_intfs = struct.unpack_from(">HHHH", data, pos)
+    intfs = struct.unpack_from(">%dH" % num_intfs, data, pos + 8)
+    return {
+        "name": class_name(this_class),
+        "super": class_name(super_class),
+        "interfaces": [class_name(x) for x in intfs],
+        "public": (access & ACC_PUBLIC) != 0,
+        "interface": (access & ACC_INTERFACE) != 0,
+        "abstract": (access & ACC_ABSTRACT) != 0,
+    }
+
+
+def _index_classes(path: str, index: Dict):
+    """
+    Adds the classes from the jar or directory to the index.
+
+    :param path: the jar or directory to scan
+    :type path: str
+    :param index: the index to add the classes to (classname -> information)
+    :type index: dict
+    """
+    def add(data: bytes, source: str):
+        if source.endswith("module-info.class") or source.endswith("package-info.class"):
+            return
+        try:
+            info = parse_class_file(data)
+        except Exception as e:
+            _logger.debug("Failed to parse %s: %s" % (source, str(e)))
+            return
+        name = info.pop("name")
+        # first occurrence on the classpath wins
+        if name not in index:
+            index[name] = info
+
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            for f in files:
+                if f.endswith(".class"):
+                    with open(os.path.join(root, f), "rb") as fp:
+                        add(fp.read(), os.path.join(root, f))
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path, "r") as zf:
+            for name in zf.namelist():
+                if name.endswith(".class") and not name.startswith("META-INF/"):
+                    add(zf.read(name), path + "!" + name)
+
+
+def class_index_dir() -> str:
+    """
+    Returns the directory that the class indices get stored in.
+
+    :return: the directory
+    :rtype: str
+    """
+    from pyadams.core.project import project_dir
+    return os.path.join(project_dir(), "cache", "classes")
+
+
+def class_index(cp: List[str] = None, rebuild: bool = False) -> Dict[str, Dict]:
+    """
+    Returns the index of all the classes on the classpath (classname -> superclass, interfaces,
+    access flags). The index gets built by parsing the class files directly, i.e., without the JVM,
+    and stored under the project directory per classpath fingerprint, so it only gets built once.
+
+    :param cp: the classpath to index (see pyadams.core.jvm.add_lib_dir), uses the one of the running JVM if None
+    :type cp: list
+    :param rebuild: whether to force rebuilding the index
+    :type rebuild: bool
+    :return: the index
+    :rtype: dict
+    """
+    return _load_class_index(cp, rebuild)[0]
+
+
+def _load_class_index(cp: Optional[List[str]], rebuild: bool):
+    """
+    Returns the index and the direct subtypes for the classpath, loading/building it if necessary.
+
+    :param cp: the classpath to index, uses the one of the running JVM if None
+    :type cp: list
+    :param rebuild: whether to force rebuilding the index
+    :type rebuild: bool
+    :return: tuple of index and subtypes (classname -> list of direct subclasses/implementations)
+    :rtype: tuple
+    """
+    import pyadams.core.jvm as jvm
+    if cp is None:
+        cp = jvm.classpath
+        if cp is None:
+            raise Exception("No classpath supplied and JVM not started!")
+    fingerprint = jvm.classpath_fingerprint(cp)
+    with _index_lock:
+        if not rebuild and (fingerprint in _class_indices):
+            return _class_indices[fingerprint]
+        path = os.path.join(class_index_dir(), fingerprint + ".json")
+        index = None
+        if not rebuild and os.path.exists(path):
+            try:
+                with open(path, "r") as fp:
+                    index = json.load(fp)
+            except Exception:
+                _logger.exception("Failed to load class index: %s" % path)
+        if index is None:
+            _logger.info("Building class index: %s" % fingerprint)
+            index = dict()
+            for part in jvm.expand_classpath(cp):
+                if os.path.exists(part):
+                    _index_classes(part, index)
+            os.makedirs(class_index_dir(), exist_ok=True)
+            tmp_file = path + ".tmp"
+            with open(tmp_file, "w") as fp:
+                json.dump(index, fp)
+            os.replace(tmp_file, path)
+        subtypes = dict()
+        for name, info in index.items():
+            for parent in ([info["super"]] + info["interfaces"]):
+                if parent is not None:
+                    subtypes.setdefault(parent, []).append(name)
+        _class_indices[fingerprint] = (index, subtypes)
+        return _class_indices[fingerprint]
+
+
+def find_classes(class_or_intf_name: str, cp: List[str] = None, concrete_only: bool = True,
+                 include_inner: bool = False) -> List[str]:
+    """
+    Lists the classes that extend the superclass or implement the interface (directly or indirectly),
+    using the class index, i.e., without the JVM. E.g., for listing all the sources (actors that
+    produce output, but do not consume any input):
+
+        cp = []
+        jvm.add_lib_dir("/some/where/adams", cp)
+        producers = find_classes("adams.flow.core.OutputProducer", cp=cp)
+        consumers = find_classes("adams.flow.core.InputConsumer", cp=cp)
+        sources = sorted(set(producers) - set(consumers))
+
+    :param class_or_intf_name: the superclass or interface, dot notation
+    :type class_or_intf_name: str
+    :param cp: the classpath to use (see pyadams.core.jvm.add_lib_dir), uses the one of the running JVM if None
+    :type cp: list
+    :param concrete_only: whether to only list public, non-abstract classes (ie the ones that can be instantiated)
+    :type concrete_only: bool
+    :param include_inner: whether to include inner classes
+    :type include_inner: bool
+    :return: the sorted classnames
+    :rtype: list
+    """
+    index, subtypes = _load_class_index(cp, False)
+    result = set()
+    pending = [class_or_intf_name]
+    while len(pending) > 0:
+        for name in subtypes.get(pending.pop(), []):
+            if name not in result:
+                result.add(name)
+                pending.append(name)
+    if concrete_only:
+        result = [x for x in result if index[x]["public"] and not index[x]["abstract"] and not index[x]["interface"]]
+    if not include_inner:
+        result = [x for x in result if "$" not in x]
+    return sorted(result)
+
+
+def is_subtype(classname: str, class_or_intf_name: str, cp: List[str] = None, concrete_only: bool = True) -> bool:
+    """
+    Checks whether the class extends the superclass or implements the interface (directly or indirectly),
+    using the class index, i.e., without the JVM (or loading the class).
+
+    :param classname: the class to check, dot notation
+    :type classname: str
+    :param class_or_intf_name: the superclass or interface, dot notation
+    :type class_or_intf_name: str
+    :param cp: the classpath to use (see pyadams.core.jvm.add_lib_dir), uses the one of the running JVM if None
+    :type cp: list
+    :param concrete_only: whether the class must be public and non-abstract (ie one that can be instantiated)
+    :type concrete_only: bool
+    :return: True if a subtype, False if not or not on the classpath
+    :rtype: bool
+    """
+    index = _load_class_index(cp, False)[0]
+    info = index.get(classname)
+    if info is None:
+        return False
+    if concrete_only and not (info["public"] and not info["abstract"] and not info["interface"]):
+        return False
+    visited = set()
+    pending = [classname]
+    while len(pending) > 0:
+        name = pending.pop()
+        if name == class_or_intf_name:
+            return True
+        if name in visited:
+            continue
+        visited.add(name)
+        info = index.get(name)
+        if info is not None:
+            pending.extend(x for x in ([info["super"]] + info["interfaces"]) if x is not None)
+    return False
@@ -0,0 +1,364 @@
+from typing import List, Optional
+
+DATE_FORMAT = "yyyy-MM-dd'T'HH:mm:ss.SSS"
+""" the format of the Weka date attributes generated for datetime columns. """
+
+
+def _convert(classname: str, obj):
+    """
+    Applies the ADAMS conversion to the object and returns the output.
+
+    :param classname: the classname of the conversion to use (adams.data.conversion.Conversion)
+    :type classname: str
+    :param obj: the Java object to convert
+    :return: the converted Java object
+    """
+    from jpype import JClass
+    conv = JClass(classname)()
+    conv.setInput(obj)
+    msg = conv.convert()
+    if msg is not None:
+        raise Exception("Failed to apply %s: %s" % (classname, str(msg)))
+    result = conv.getOutput()
+    conv.cleanUp()
+    return result
+
+
+def _new_instances(relation: str, attributes: List, matrix, class_index: Optional[int]):
+    """
+    Creates a new weka.core.Instances object from the attributes and the row-major data matrix.
+    The matrix is transferred to Java in a single bulk copy, the only call per row is the
+    construction of the weka.core.DenseInstance; the rows get added in a single call.
+
+    :param relation: the relation name
+    :type relation: str
+    :param attributes: the list of weka.core.Attribute objects
+    :type attributes: list
+    :param matrix: the 2-dim float64 numpy array (rows x attributes)
+    :param class_index: the 0-based index of the class attribute, None for no class
+    :type class_index: int
+    :return: the weka.core.Instances object
+    """
+    import numpy as np
+    from jpype import JClass, JArray
+    Arrays = JClass("java.util.Arrays")
+    DenseInstance = JClass("weka.core.DenseInstance")
+    atts = JClass("java.util.ArrayList")(Arrays.asList(JArray(JClass("weka.core.Attribute"))(attributes)))
+    result = JClass("weka.core.Instances")(relation, atts, matrix.shape[0])
+    if matrix.shape[0] > 0:
+        rows = JArray.of(np.ascontiguousarray(matrix, dtype=np.float64))
+        insts = JArray(DenseInstance)([DenseInstance(1.0, row) for row in rows])
+        result.addAll(Arrays.asList(insts))
+    if class_index is not None:
+        result.setClassIndex(class_index)
+    return result
+
+
+def ndarray_to_instances(data, columns: List[str] = None, relation: str = "pyadams", class_index: int = None):
+    """
+    Converts the 2-dim numeric numpy array into a weka.core.Instances object with numeric attributes.
+
+    :param data: the numpy array to convert (rows x columns), NaN for missing values
+    :param columns: the attribute names, uses att-1, att-2, ... if None
+    :type columns: list
+    :param relation: the relation name to use
+    :type relation: str
+    :param class_index: the 0-based index of the class attribute, None for no class
+    :type class_index: int
+    :return: the weka.core.Instances object
+    """
+    import numpy as np
+    from jpype import JClass
+    data = np.asarray(data, dtype=np.float64)
+    if data.ndim != 2:
+        raise Exception("Expected 2-dim array, but got %d dims!" % data.ndim)
+    if columns is None:
+        columns = ["att-%d" % (i + 1) for i in range(data.shape[1])]
+    if len(columns) != data.shape[1]:
+        raise Exception("Number of column names and columns differ: %d != %d" % (len(columns), data.shape[1]))
+    Attribute = JClass("weka.core.Attribute")
+    attributes = [Attribute(str(x)) for x in columns]
+    return _new_instances(relation, attributes, data, class_index)
+
+
+def dataframe_to_instances(df, relation: str = "pyadams", class_index: int = None):
+    """
+    Converts the pandas DataFrame into a weka.core.Instances object. Numeric and boolean
+    columns turn into numeric attributes, datetime columns into date attributes (timezone-aware
+    ones get converted to UTC) and all other columns into nominal ones.
+
+    :param df: the pandas DataFrame to convert
+    :param relation: the relation name to use
+    :type relation: str
+    :param class_index: the 0-based index of the class attribute, None for no class
+    :type class_index: int
+    :return: the weka.core.Instances object
+    """
+    import numpy as np
+    import pandas as pd
+    from jpype import JClass
+    Attribute = JClass("weka.core.Attribute")
+    ArrayList = JClass("java.util.ArrayList")
+    attributes = []
+    matrix = np.empty((len(df), len(df.columns)), dtype=np.float64)
+    for i, name in enumerate(df.columns):
+        col = df[name]
+        if pd.api.types.is_datetime64_any_dtype(col.dtype):
+            attributes.append(Attribute(str(name), DATE_FORMAT))
+            if col.dt.tz is not None:
+                col = col.dt.tz_convert("UTC").dt.tz_localize(None)
+            millis = col.to_numpy(dtype="datetime64[ms]").astype(np.int64).astype(np.float64)
+            millis[col.isna().to_numpy()] = np.nan
+            matrix[:, i] = millis
+        elif pd.api.types.is_numeric_dtype(col.dtype) or pd.api.types.is_bool_dtype(col.dtype):
+            attributes.append(Attribute(str(name)))
+            matrix[:, i] = col.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            cat = col.astype("category").cat
+            labels = ArrayList(len(cat.categories))
+            for label in cat.categories:
+                labels.add(str(label))
+            attributes.append(Attribute(str(name), labels))
+            codes = cat.codes.to_numpy().astype(np.float64)
+            codes[codes < 0] = np.nan
+            matrix[:, i] = codes
+    return _new_instances(relation, attributes, matrix, class_index)
+
+
+def instances_to_ndarray(data):
+    """
+    Converts the weka.core.Instances object into a 2-dim float64 numpy array (rows x attributes),
+    retrieving the values column by column. Nominal/string attributes are represented by
+    their label indices, missing values by NaN.
+
+    :param data: the weka.core.Instances object to convert
+    :return: the numpy array
+    """
+    import numpy as np
+    result = np.empty((data.numInstances(), data.numAttributes()), dtype=np.float64)
+    for i in range(data.numAttributes()):
+        result[:, i] = np.asarray(data.attributeToDoubleArray(i), dtype=np.float64)
+    return result
+
+
+def instances_to_dataframe(data):
+    """
+    Converts the weka.core.Instances object into a pandas DataFrame, retrieving the values
+    column by column. Nominal/string attributes turn into categorical columns, date attributes
+    into datetime columns.
+
+    :param data: the weka.core.Instances object to convert
+    :return: the pandas DataFrame
+    """
+    import numpy as np
+    import pandas as pd
+    columns = dict()
+    for i in range(data.numAttributes()):
+        att = data.attribute(i)
+        values = np.asarray(data.attributeToDoubleArray(i), dtype=np.float64)
+        if att.isNominal() or att.isString():
+            labels = [str(att.value(n)) for n in range(att.numValues())]
+            codes = np.where(np.isnan(values), -1, values).astype(np.int64)
+            columns[str(att.name())] = pd.Categorical.from_codes(codes, categories=labels)
+        elif att.isDate():
+            columns[str(att.name())] = pd.to_datetime(values, unit="ms")
+        else:
+            columns[str(att.name())] = values
+    return pd.DataFrame(columns)
+
+
+def instances_to_spreadsheet(data):
+    """
+    Converts the weka.core.Instances object into an adams.data.spreadsheet.SpreadSheet.
+    The conversion is performed on the Java side.
+
+    :param data: the weka.core.Instances object to convert
+    :return: the SpreadSheet object
+    """
+    return _convert("adams.data.conversion.WekaInstancesToSpreadSheet", data)
+
+
+def spreadsheet_to_instances(sheet):
+    """
+    Converts the adams.data.spreadsheet.SpreadSheet into a weka.core.Instances object.
+    The conversion is performed on the Java side.
+
+    :param sheet: the SpreadSheet object to convert
+    :return: the weka.core.Instances object
+    """
+    return _convert("adams.data.conversion.SpreadSheetToWekaInstances", sheet)
+
+
+def ndarray_to_spreadsheet(data, columns: List[str] = None):
+    """
+    Converts the 2-dim numeric numpy array into an adams.data.spreadsheet.SpreadSheet.
+
+    :param data: the numpy array to convert (rows x columns), NaN for missing values
+    :param columns: the column names, uses att-1, att-2, ... if None
+    :type columns: list
+    :return: the SpreadSheet object
+    """
+    return instances_to_spreadsheet(ndarray_to_instances(data, columns=columns))
+
+
+def dataframe_to_spreadsheet(df):
+    """
+    Converts the pandas DataFrame into an adams.data.spreadsheet.SpreadSheet.
+
+    :param df: the pandas DataFrame to convert
+    :return: the SpreadSheet object
+    """
+    return instances_to_spreadsheet(dataframe_to_instances(df))
+
+
+def spreadsheet_to_ndarray(sheet):
+    """
+    Converts the adams.data.spreadsheet.SpreadSheet into a 2-dim float64 numpy array.
+
+    :param sheet: the SpreadSheet object to convert
+    :return: the numpy array
+    """
+    return instances_to_ndarray(spreadsheet_to_instances(sheet))
+
+
+def spreadsheet_to_dataframe(sheet):
+    """
+    Converts the adams.data.spreadsheet.SpreadSheet into a pandas DataFrame.
+
+    :param sheet: the SpreadSheet object to convert
+    :return: the pandas DataFrame
+    """
+    return instances_to_dataframe(spreadsheet_to_instances(sheet))
+
+
+_to_java_converters = dict()
+""" the cached converters from Python to Java, per Python type. """
+
+_from_java_converters = dict()
+""" the cached converters from Java to Python, per Java classname. """
+
+
+def _ndarray_to_java(obj, by_reference: bool):
+    """
+    Converts the numpy array to a Java array (bulk copy) or, if by reference and contiguous,
+    to a direct java.nio.ByteBuffer (in native byte order) that shares the memory with the array.
+
+    :param obj: the numpy array to convert
+    :param by_reference: whether to pass the data by reference if possible
+    :type by_reference: bool
+    :return: the Java array or buffer
+    """
+    from jpype import JArray, JClass
+    if by_reference and obj.flags["C_CONTIGUOUS"] and obj.flags["WRITEABLE"]:
+        import jpype.nio
+        buffer = jpype.nio.convertToDirectBuffer(obj)
+        return buffer.order(JClass("java.nio.ByteOrder").nativeOrder())
+    return JArray.of(obj)
+
+
+def _resolve_to_java(obj):
+    """
+    Determines the converter for the type of the Python object.
+
+    :param obj: the object to determine the converter for
+    :return: the converter, a function taking the object and the by_reference flag
+    """
+    import numpy as np
+    from jpype import JClass, JObject, JString
+    if isinstance(obj, JObject):
+        return lambda o, r: o
+    if isinstance(obj, bool):
+        return lambda o, r: JClass("java.lang.Boolean")(o)
+    if isinstance(obj, int):
+        return lambda o, r: JClass("java.lang.Integer")(o) if (-2 ** 31 <= o < 2 ** 31) else JClass("java.lang.Long")(o)
+    if isinstance(obj, float):
+        return lambda o, r: JClass("java.lang.Double")(o)
+    if isinstance(obj, str):
+        return lambda o, r: JString(o)
+    if isinstance(obj, np.ndarray):
+        return _ndarray_to_java
+    if isinstance(obj, np.generic):
+        return lambda o, r: to_java(o.item(), r)
+    if isinstance(obj, dict):
+        def convert_dict(o, r):
+            result = JClass("java.util.HashMap")()
+            for k in o:
+                result.put(to_java(k, r), to_java(o[k], r))
+            return result
+        return convert_dict
+    if isinstance(obj, (list, tuple)):
+        def convert_list(o, r):
+            result = JClass("java.util.ArrayList")(len(o))
+            for x in o:
+                result.add(to_java(x, r))
+            return result
+        return convert_list
+    raise Exception("Cannot convert Python type to Java: %s" % str(type(obj)))
+
+
+def to_java(obj, by_reference: bool = False):
+    """
+    Converts the Python object (primitives, strings, lists, dicts, numpy arrays) into a Java object.
+    The converters get cached per type.
+
+    :param obj: the object to convert
+    :param by_reference: whether to pass (contiguous) numpy arrays as direct ByteBuffer rather than copying them
+    :type by_reference: bool
+    :return: the Java object
+    """
+    if obj is None:
+        return None
+    converter = _to_java_converters.get(type(obj), None)
+    if converter is None:
+        converter = _resolve_to_java(obj)
+        _to_java_converters[type(obj)] = converter
+    return converter(obj, by_reference)
+
+
+def _resolve_from_java(obj):
+    """
+    Determines the converter for the class of the Java object.
+
+    :param obj: the Java object to determine the converter for
+    :return: the converter, a function taking the Java object
+    """
+    import numpy as np
+    from jpype import JClass
+    if isinstance(obj, str):
+        return str
+    jclass = obj.getClass()
+    if jclass.isArray() and jclass.getComponentType().isPrimitive():
+        return lambda o: np.array(o)
+    if isinstance(obj, JClass("java.lang.Boolean")):
+        return lambda o: bool(o.booleanValue())
+    if isinstance(obj, (JClass("java.lang.Integer"), JClass("java.lang.Long"), JClass("java.lang.Short"), JClass("java.lang.Byte"))):
+        return lambda o: int(o.longValue())
+    if isinstance(obj, JClass("java.lang.Number")):
+        return lambda o: float(o.doubleValue())
+    if isinstance(obj, JClass("java.lang.String")):
+        return str
+    if isinstance(obj, JClass("java.util.Map")):
+        return lambda o: {from_java(k): from_java(o.get(k)) for k in o.keySet()}
+    if isinstance(obj, JClass("java.util.Collection")):
+        return lambda o: [from_java(x) for x in o.toArray()]
+    if jclass.isArray():
+        return lambda o: [from_java(x) for x in o]
+    return lambda o: o
+
+
+def from_java(obj):
+    """
+    Converts the Java object into a Python one (primitives, strings, lists, dicts, numpy arrays
+    for primitive arrays). Other objects are returned as is. The converters get cached per Java class.
+
+    :param obj: the Java object to convert
+    :return: the Python object
+    """
+    if obj is None:
+        return None
+    key = type(obj)
+    converter = _from_java_converters.get(key, None)
+    if converter is None:
+        converter = _resolve_from_java(obj)
+        _from_java_converters[key] = converter
+    return converter(obj)
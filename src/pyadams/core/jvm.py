@@ -14,15 +14,13 @@
 # jvm.py
 # Copyright (C) 2024 Fracpete (fracpete at waikato dot ac dot nz)
 
+import glob
+import hashlib
 import logging
 import os
 from typing import List
 
 import pyadams.core.platform as platform
-import jpype
-import jpype.imports
-from jpype import JClass
-from wai.logging import init_logging
 
 
 ENV_PYADAMS_LOGLEVEL = "PYADAMS_LOGLEVEL"
@@ -34,17 +32,34 @@ is_started = None
 is_headless = None
 """ whether we are running in headless mode. """
 
-# logging setup
-init_logging(env_var=ENV_PYADAMS_LOGLEVEL)
+classpath = None
+""" the classpath that the JVM was started with. """
+
+_logging_initialized = False
+""" whether the logging has been initialized. """
+
 _logger = logging.getLogger(__name__)
 _logger.setLevel(logging.DEBUG)
 
 
+def init_logging():
+    """
+    Initializes the logging, using the level from the ENV_PYADAMS_LOGLEVEL environment variable.
+    Only performed once, subsequent calls have no effect.
+    """
+    global _logging_initialized
+    if _logging_initialized:
+        return
+    from wai.logging import init_logging as wai_init_logging
+    wai_init_logging(env_var=ENV_PYADAMS_LOGLEVEL)
+    _logging_initialized = True
+
+
 def add_lib_dir(root_dir: str, cp: List[str]):
     """
     Adds the ADAMS library dirs to the classpath.
 
-    :param root_dir: the ADAMS root directory to use
+    :param root_dir: the ADAMS root directory to use or the directory that the ADAMS archive was extracted into
     :type root_dir: str
     :param cp: the list to append the classpath to
     :type cp: list
@@ -52,15 +67,16 @@ def add_lib_dir(root_dir: str, cp: List[str]):
     if not os.path.exists(root_dir):
         raise Exception("ADAMS root dir does not exist: %s" % root_dir)
 
+    # directory with the extracted archive (e.g., created by pa-download)? use the ADAMS dir inside
+    if not os.path.exists(os.path.join(root_dir, "lib")):
+        sub_dirs = [x for x in os.listdir(root_dir) if os.path.isdir(os.path.join(root_dir, x, "lib"))]
+        if len(sub_dirs) == 1:
+            root_dir = os.path.join(root_dir, sub_dirs[0])
+            _logger.debug("Using ADAMS root dir: %s" % root_dir)
+
     cp.append(os.path.join(root_dir, "lib", "*"))
 
-    sub_dir = None
-    if platform.is_linux():
-        sub_dir = "linux64"
-    elif platform.is_windows():
-        sub_dir = "windows64"
-    elif platform.is_mac():
-        sub_dir = "macosx64"
+    sub_dir = platform.native_lib_dir()
     if sub_dir is not None:
         cp.append(os.path.join(root_dir, "lib", sub_dir, "*"))
 
@@ -80,8 +96,53 @@ def add_system_classpath(cp: List[str]):
         _logger.warning("Cannot add system's classpath, as environment variable CLASSPATH not set.")
 
 
+def expand_classpath(cp: List[str]) -> List[str]:
+    """
+    Expands the wildcards in the classpath (eg lib/*) into the jars they match.
+
+    :param cp: the classpath to expand
+    :type cp: list
+    :return: the expanded classpath
+    :rtype: list
+    """
+    result = []
+    for part in cp:
+        if os.path.basename(part) == "*":
+            dir_ = os.path.dirname(part)
+            result.extend(sorted(x for x in glob.glob(os.path.join(dir_, "*")) if x.lower().endswith(".jar")))
+        else:
+            result.append(part)
+    return result
+
+
+def classpath_fingerprint(cp: List[str] = None) -> str:
+    """
+    Generates a fingerprint of the classpath from the names, sizes and modification times of its
+    jars/directories, to be used as key for persisted data that depends on the available classes.
+
+    :param cp: the classpath to generate the fingerprint for, uses the one that the JVM was started with if None
+    :type cp: list
+    :return: the fingerprint (hex digest)
+    :rtype: str
+    """
+    if cp is None:
+        if classpath is None:
+            raise Exception("No classpath supplied and JVM not started!")
+        cp = classpath
+    digest = hashlib.sha256()
+    for part in expand_classpath(cp):
+        path = os.path.abspath(part)
+        if os.path.exists(path):
+            st = os.stat(path)
+            digest.update(("%s|%d|%d\n" % (path, st.st_size, st.st_mtime_ns)).encode("utf-8"))
+        else:
+            digest.update(("%s\n" % path).encode("utf-8"))
+    return digest.hexdigest()
+
+
 def start(root_dir: str, system_cp: bool = False, max_heap_size: str = None, headless: bool = False,
-          system_info=False, convert_strings: bool = True, logging_level: int = logging.DEBUG):
+          system_info=False, convert_strings: bool = True, logging_level: int = logging.DEBUG,
+          auto_config: bool = False, profile: str = None, log_bridge: bool = False, log_bridge_level: str = "INFO"):
     """
     Initializes the jpype connection (starts up the JVM).
 
@@ -99,9 +160,18 @@ def start(root_dir: str, system_cp: bool = False, max_heap_size: str = None, hea
     :type convert_strings: bool
     :param logging_level: the logging level to use for this module, e.g., logging.DEBUG or logging.INFO
     :type logging_level: int
+    :param auto_config: whether to derive heap size, processor count and GC from the (container) resources, an explicit max_heap_size takes precedence
+    :type auto_config: bool
+    :param profile: the performance profile to use for the automatic configuration (see pyadams.core.resources.PROFILES), implies auto_config
+    :type profile: str
+    :param log_bridge: whether to forward the Java log records into the Python logging framework (see pyadams.core.logbridge)
+    :type log_bridge: bool
+    :param log_bridge_level: the minimum Java logging level of the records to forward (SEVERE, WARNING, INFO, CONFIG, FINE, FINER, FINEST)
+    :type log_bridge_level: str
     """
-    global is_started, is_headless, _logger
+    global is_started, is_headless, classpath, _logger
 
+    init_logging()
     _logger.setLevel(logging_level)
 
     if is_started is not None:
@@ -128,16 +198,36 @@ def start(root_dir: str, system_cp: bool = False, max_heap_size: str = None, hea
     if max_heap_size is not None:
         _logger.debug("MaxHeapSize=%s" % max_heap_size)
         args.append("-Xmx%s" % max_heap_size)
-    else:
+    elif not auto_config and (profile is None):
         _logger.debug("MaxHeapSize=default")
 
+    # resources
+    if auto_config or (profile is not None):
+        from pyadams.core.resources import jvm_settings, jvm_args, PROFILE_AUTO
+        settings = jvm_settings(PROFILE_AUTO if (profile is None) else profile)
+        resource_args = jvm_args(settings, include_heap=(max_heap_size is None))
+        _logger.info("JVM resources: profile=%s, memory=%sMB, cpus=%d, gc=%s, args=%s"
+                     % (settings["profile"], str(settings["memory_mb"]), settings["cpus"], settings["gc"],
+                        " ".join(resource_args)))
+        args.extend(resource_args)
+
     # headless mode
     is_headless = headless
     if headless:
         args.append("-Djava.awt.headless=true")
 
+    # jpype is only imported once it is actually required
+    import jpype
+    import jpype.imports
+    from jpype import JClass
+
     jpype.startJVM(*args, classpath=full_cp, convertStrings=convert_strings)
     is_started = True
+    classpath = full_cp
+
+    if log_bridge:
+        from pyadams.core.logbridge import install_bridge
+        install_bridge(level=log_bridge_level)
 
     if system_info:
         _logger.debug(JClass("adams.core.SystemInfo")())
@@ -145,9 +235,13 @@ def start(root_dir: str, system_cp: bool = False, max_heap_size: str = None, hea
 
 def stop():
     """
-    Kills the JVM.
+    Kills the JVM. Forwards any pending Java log records first if the logging bridge is installed.
     """
-    global is_started
+    global is_started, classpath
     if is_started is not None:
+        from pyadams.core.logbridge import uninstall_bridge
+        uninstall_bridge()
         is_started = None
+        classpath = None
+        import jpype
         jpype.shutdownJVM()
@@ -0,0 +1,135 @@
+import atexit
+import logging
+import os
+import threading
+import traceback
+import weakref
+from typing import List, Tuple
+
+_logger = logging.getLogger(__name__)
+
+ENV_PYADAMS_LEAK_TRACKING = "PYADAMS_LEAK_TRACKING"
+""" environment variable for enabling the leak tracking (true/1/yes). """
+
+_enabled = os.environ.get(ENV_PYADAMS_LEAK_TRACKING, "").lower() in ["true", "1", "yes"]
+""" whether leak tracking is enabled. """
+
+_tracked = dict()
+""" the tracked wrappers that have not been closed yet: id -> (classname, allocation site). """
+
+_lock = threading.Lock()
+""" for synchronizing access to the tracked wrappers. """
+
+_atexit_registered = False
+""" whether the report has been registered to get output at exit. """
+
+
+def enable():
+    """
+    Enables the leak tracking. The wrappers that own Java resources and were created afterwards
+    get tracked, together with their allocation site. Any wrapper that gets garbage collected
+    without being closed gets reported immediately, the ones still open get reported at exit.
+    """
+    global _enabled
+    _enabled = True
+    _register_atexit()
+
+
+def disable():
+    """
+    Disables the leak tracking and forgets all tracked wrappers.
+    """
+    global _enabled
+    _enabled = False
+    with _lock:
+        _tracked.clear()
+
+
+def is_enabled() -> bool:
+    """
+    Returns whether leak tracking is enabled.
+
+    :return: True if enabled
+    :rtype: bool
+    """
+    return _enabled
+
+
+def _register_atexit():
+    """
+    Registers the report to get output at exit, if not done so already.
+    """
+    global _atexit_registered
+    if not _atexit_registered:
+        atexit.register(log_report)
+        _atexit_registered = True
+
+
+def _collected(key: int):
+    """
+    Gets called when a tracked wrapper got garbage collected.
+
+    :param key: the ID of the wrapper
+    :type key: int
+    """
+    with _lock:
+        entry = _tracked.pop(key, None)
+    if entry is not None:
+        _logger.warning("%s was garbage collected without being closed, allocated at:\n%s" % entry)
+
+
+def track(obj, classname: str):
+    """
+    Starts tracking the wrapper, if leak tracking is enabled.
+
+    :param obj: the wrapper to track
+    :param classname: the Java classname of the wrapped object
+    :type classname: str
+    """
+    if not _enabled:
+        return
+    site = "".join(traceback.format_stack()[:-2])
+    key = id(obj)
+    with _lock:
+        _tracked[key] = (classname, site)
+    # the ones still open at exit get output by log_report instead
+    weakref.finalize(obj, _collected, key).atexit = False
+
+
+def untrack(obj):
+    """
+    Stops tracking the wrapper, as it got closed.
+
+    :param obj: the wrapper to stop tracking
+    """
+    if not _enabled:
+        return
+    with _lock:
+        _tracked.pop(id(obj), None)
+
+
+def report() -> List[Tuple[str, str]]:
+    """
+    Returns the wrappers that are still open.
+
+    :return: the list of classname and allocation site tuples
+    :rtype: list
+    """
+    with _lock:
+        return list(_tracked.values())
+
+
+def log_report():
+    """
+    Outputs the wrappers that are still open as warnings.
+    """
+    leaks = report()
+    if len(leaks) == 0:
+        return
+    _logger.warning("%d wrapper(s) never closed" % len(leaks))
+    for classname, site in leaks:
+        _logger.warning("%s allocated at:\n%s" % (classname, site))
+
+
+if _enabled:
+    _register_atexit()
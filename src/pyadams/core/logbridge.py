@@ -0,0 +1,285 @@
+import logging
+import re
+import threading
+import xml.etree.ElementTree as ET
+from typing import Optional
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_LEVEL = "INFO"
+""" the default Java logging level for records to forward. """
+
+DEFAULT_BUFFER_SIZE = 10000
+""" the default number of Java log records to buffer between drains. """
+
+DEFAULT_INTERVAL = 0.5
+""" the default interval in seconds between drains. """
+
+LOGGER_PREFIX = "pyadams.java"
+""" the prefix for the Python loggers that the Java log records get forwarded to. """
+
+LEVELS = {
+    "SEVERE": logging.ERROR,
+    "WARNING": logging.WARNING,
+    "INFO": logging.INFO,
+    "CONFIG": logging.INFO,
+    "FINE": logging.DEBUG,
+    "FINER": 5,
+    "FINEST": 5,
+}
+""" the mapping of Java logging levels to Python ones. """
+
+_RECORD = re.compile(r"<record>.*?</record>", re.DOTALL)
+
+
+class LoggingBridge:
+    """
+    Forwards the Java log records (java.util.logging) into the Python logging framework.
+    The records get buffered on the Java side in a java.util.logging.MemoryHandler (a ring buffer,
+    the oldest records get overwritten when full) that is attached to the root logger. Records below
+    the level get discarded by the handler, i.e., without involving Python. If the level is below the
+    root logger's level, the root logger's level gets lowered while installed (loggers with an
+    explicitly set level, e.g., via an actor's loggingLevel option, are not affected). A daemon thread
+    drains the buffer periodically: while holding the handler's lock, the records only get moved into
+    a second MemoryHandler (i.e., logging threads get blocked only briefly), then the whole batch gets
+    serialized with the XMLFormatter into a single string and the records get emitted via the loggers
+    below LOGGER_PREFIX (e.g., pyadams.java.adams.flow.control.Flow).
+
+    Usage:
+
+        bridge = LoggingBridge(level="FINE")
+        bridge.install()
+        ...
+        bridge.uninstall()
+    """
+
+    def __init__(self, level: str = DEFAULT_LEVEL, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 interval: float = DEFAULT_INTERVAL, remove_handlers: bool = True):
+        """
+        Initializes the bridge.
+
+        :param level: the minimum Java logging level (SEVERE, WARNING, INFO, CONFIG, FINE, FINER, FINEST) of records to forward
+        :type level: str
+        :param buffer_size: the number of records to buffer on the Java side between drains
+        :type buffer_size: int
+        :param interval: the interval in seconds between drains
+        :type interval: float
+        :param remove_handlers: whether to remove the other handlers from the Java root logger to avoid duplicate output (get restored when uninstalling)
+        :type remove_handlers: bool
+        """
+        if level.upper() not in LEVELS:
+            raise Exception("Unknown Java logging level '%s', available: %s" % (level, ", ".join(LEVELS)))
+        if buffer_size < 1:
+            raise Exception("Buffer size must be at least 1: %d" % buffer_size)
+        if interval <= 0:
+            raise Exception("Interval must be greater than 0: %f" % interval)
+        self.level = level.upper()
+        self.buffer_size = buffer_size
+        self.interval = interval
+        self.remove_handlers = remove_handlers
+        self._memory = None
+        self._staging = None
+        self._target = None
+        self._stream = None
+        self._removed = []
+        self._root_level = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._drain_lock = threading.Lock()
+
+    @property
+    def is_installed(self) -> bool:
+        """
+        Returns whether the bridge is currently installed.
+
+        :return: True if installed
+        :rtype: bool
+        """
+        return self._memory is not None
+
+    def install(self):
+        """
+        Attaches the buffering handler to the Java root logger and starts the drain thread.
+        """
+        if self.is_installed:
+            return
+        from jpype import JClass
+        Level = JClass("java.util.logging.Level")
+        level = Level.parse(self.level)
+        self._stream = JClass("java.io.ByteArrayOutputStream")()
+        self._target = JClass("java.util.logging.StreamHandler")(self._stream, JClass("java.util.logging.XMLFormatter")())
+        self._target.setEncoding("UTF-8")
+        self._target.setLevel(Level.ALL)
+        # never push automatically, only when draining
+        self._staging = JClass("java.util.logging.MemoryHandler")(self._target, self.buffer_size, Level.OFF)
+        self._staging.setLevel(Level.ALL)
+        self._memory = JClass("java.util.logging.MemoryHandler")(self._staging, self.buffer_size, Level.OFF)
+        self._memory.setLevel(level)
+
+        root = JClass("java.util.logging.LogManager").getLogManager().getLogger("")
+        # loggers inherit the root level, records below it never reach any handler
+        if (root.getLevel() is not None) and (level.intValue() < root.getLevel().intValue()):
+            self._root_level = root.getLevel()
+            root.setLevel(level)
+        if self.remove_handlers:
+            self._removed = list(root.getHandlers())
+            for handler in self._removed:
+                root.removeHandler(handler)
+        root.addHandler(self._memory)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pyadams-log-bridge", daemon=True)
+        self._thread.start()
+        _logger.debug("Java logging bridge installed: level=%s, buffer=%d" % (self.level, self.buffer_size))
+
+    def _run(self):
+        """
+        Drains the buffer periodically until stopped.
+        """
+        while not self._stop.wait(self.interval):
+            try:
+                self.drain()
+            except Exception:
+                _logger.exception("Failed to drain Java log records")
+
+    def drain(self) -> int:
+        """
+        Forwards all the buffered Java log records to the Python loggers.
+
+        :return: the number of forwarded records
+        :rtype: int
+        """
+        import jpype
+        with self._drain_lock:
+            if not self.is_installed:
+                return 0
+            # only moves the records, the logging threads compete for this lock
+            with jpype.synchronized(self._memory):
+                self._memory.push()
+            # formatting happens in the staging handler, which only the drain uses
+            self._staging.push()
+            self._target.flush()
+            data = str(self._stream.toString("UTF-8"))
+            self._stream.reset()
+        result = 0
+        for record in _RECORD.findall(data):
+            if self._emit(record):
+                result += 1
+        return result
+
+    def _emit(self, record: str) -> bool:
+        """
+        Emits the XML-serialized Java log record via the corresponding Python logger.
+
+        :param record: the <record> element generated by the XMLFormatter
+        :type record: str
+        :return: True if successfully parsed
+        :rtype: bool
+        """
+        try:
+            elem = ET.fromstring(record)
+        except ET.ParseError:
+            _logger.debug("Failed to parse Java log record: %s" % record)
+            return False
+
+        name = elem.findtext("logger", default="")
+        logger = logging.getLogger(LOGGER_PREFIX if (len(name) == 0) else (LOGGER_PREFIX + "." + name))
+        level = LEVELS.get(elem.findtext("level", default=""), logging.INFO)
+        if not logger.isEnabledFor(level):
+            return True
+
+        msg = elem.findtext("message", default="")
+        exc = elem.find("exception")
+        if exc is not None:
+            lines = [exc.findtext("message", default="")]
+            for frame in exc.findall("frame"):
+                lines.append("\tat %s.%s(%s)" % (frame.findtext("class", default=""),
+                                                 frame.findtext("method", default=""),
+                                                 frame.findtext("line", default="?")))
+            msg += "\n" + "\n".join(lines)
+
+        rec = logger.makeRecord(logger.name, level, elem.findtext("class", default="(java)"), 0, msg, None, None,
+                                func=elem.findtext("method", default=None))
+        millis = elem.findtext("millis", default=None)
+        if millis is not None:
+            rec.created = int(millis) / 1000.0
+            rec.msecs = int(millis) % 1000
+        rec.threadName = "java-%s" % elem.findtext("thread", default="?")
+        logger.handle(rec)
+        return True
+
+    def uninstall(self):
+        """
+        Stops the drain thread, forwards the remaining records and restores the Java root logger's handlers.
+        """
+        if not self.is_installed:
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.drain()
+
+        from jpype import JClass
+        root = JClass("java.util.logging.LogManager").getLogManager().getLogger("")
+        root.removeHandler(self._memory)
+        for handler in self._removed:
+            root.addHandler(handler)
+        self._removed = []
+        if self._root_level is not None:
+            root.setLevel(self._root_level)
+            self._root_level = None
+        with self._drain_lock:
+            self._memory.close()
+            self._memory = None
+            self._staging = None
+            self._target = None
+            self._stream = None
+        _logger.debug("Java logging bridge uninstalled")
+
+
+_bridge = None
+""" the bridge installed via install_bridge. """
+
+
+def install_bridge(level: str = DEFAULT_LEVEL, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                   interval: float = DEFAULT_INTERVAL, remove_handlers: bool = True) -> LoggingBridge:
+    """
+    Installs the global Java logging bridge, replacing any previously installed one.
+
+    :param level: the minimum Java logging level of records to forward
+    :type level: str
+    :param buffer_size: the number of records to buffer on the Java side between drains
+    :type buffer_size: int
+    :param interval: the interval in seconds between drains
+    :type interval: float
+    :param remove_handlers: whether to remove the other handlers from the Java root logger
+    :type remove_handlers: bool
+    :return: the bridge
+    :rtype: LoggingBridge
+    """
+    global _bridge
+    uninstall_bridge()
+    _bridge = LoggingBridge(level=level, buffer_size=buffer_size, interval=interval, remove_handlers=remove_handlers)
+    _bridge.install()
+    return _bridge
+
+
+def uninstall_bridge():
+    """
+    Uninstalls the global Java logging bridge, if installed.
+    """
+    global _bridge
+    if _bridge is not None:
+        _bridge.uninstall()
+        _bridge = None
+
+
+def current_bridge() -> Optional[LoggingBridge]:
+    """
+    Returns the global Java logging bridge.
+
+    :return: the bridge, None if not installed
+    :rtype: LoggingBridge
+    """
+    return _bridge
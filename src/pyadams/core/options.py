@@ -0,0 +1,585 @@
+import json
+import logging
+import os
+import shlex
+import threading
+from typing import Dict, List, Optional, Union
+
+import pyadams.core.jvm as jvm
+from pyadams.core.project import project_dir
+
+_logger = logging.getLogger(__name__)
+
+TYPE_BOOLEAN = "boolean"
+TYPE_INT = "int"
+TYPE_FLOAT = "float"
+TYPE_STRING = "string"
+TYPE_ENUM = "enum"
+TYPE_OBJECT = "object"
+TYPES = [
+    TYPE_BOOLEAN,
+    TYPE_INT,
+    TYPE_FLOAT,
+    TYPE_STRING,
+    TYPE_ENUM,
+    TYPE_OBJECT,
+]
+
+KEY_CLASS = "class"
+""" the key in configurations (see Actor.to_dict/apply_dict) that holds the classname. """
+
+KEY_OPTIONS = "options"
+""" the key in configurations that holds the options, if the JSON producer nests them. """
+
+LAYOUT_NESTED = "nested"
+LAYOUT_FLAT = "flat"
+""" the layouts of configurations: options below KEY_OPTIONS or alongside KEY_CLASS. """
+
+OPTION_HANDLER = "adams.core.option.OptionHandler"
+""" the interface that classes must implement for extracting their option schema. """
+
+INT_CLASSES = ["java.lang.Byte", "java.lang.Short", "java.lang.Integer", "java.lang.Long"]
+FLOAT_CLASSES = ["java.lang.Float", "java.lang.Double"]
+
+SCHEMA_VERSION = 2
+""" the version of the schema format, part of the cache file name. """
+
+_schemas = dict()
+""" the cached schemas: fingerprint -> classname -> schema. """
+
+_fingerprint = None
+""" the cached fingerprint of the JVM's classpath (tuple of classpath and fingerprint). """
+
+_lock = threading.RLock()
+""" for synchronizing access to the cache. """
+
+
+def cache_dir() -> str:
+    """
+    Returns the directory that the schemas get persisted in.
+
+    :return: the directory
+    :rtype: str
+    """
+    return os.path.join(project_dir(), "cache", "options")
+
+
+def _cache_file(fingerprint: str) -> str:
+    """
+    Returns the file with the persisted schemas for the classpath fingerprint.
+
+    :param fingerprint: the classpath fingerprint
+    :type fingerprint: str
+    :return: the file
+    :rtype: str
+    """
+    return os.path.join(cache_dir(), "%s-v%d.json" % (fingerprint, SCHEMA_VERSION))
+
+
+def current_fingerprint() -> str:
+    """
+    Returns the fingerprint of the classpath of the running JVM (computed only once per classpath).
+
+    :return: the fingerprint
+    :rtype: str
+    """
+    global _fingerprint
+    if jvm.classpath is None:
+        raise Exception("JVM not started, a classpath fingerprint must be supplied!")
+    cp = tuple(jvm.classpath)
+    if (_fingerprint is None) or (_fingerprint[0] != cp):
+        _fingerprint = (cp, jvm.classpath_fingerprint(list(cp)))
+    return _fingerprint[1]
+
+
+def _load(fingerprint: str) -> Dict[str, Dict]:
+    """
+    Returns the schemas for the fingerprint, loading the persisted ones on first access.
+
+    :param fingerprint: the classpath fingerprint
+    :type fingerprint: str
+    :return: the schemas (classname -> schema)
+    :rtype: dict
+    """
+    if fingerprint not in _schemas:
+        path = _cache_file(fingerprint)
+        schemas = dict()
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as fp:
+                    schemas = json.load(fp)
+            except Exception:
+                _logger.exception("Failed to load option schemas: %s" % path)
+        _schemas[fingerprint] = schemas
+    return _schemas[fingerprint]
+
+
+def _save(fingerprint: str):
+    """
+    Persists the schemas for the fingerprint.
+
+    :param fingerprint: the classpath fingerprint
+    :type fingerprint: str
+    """
+    os.makedirs(cache_dir(), exist_ok=True)
+    path = _cache_file(fingerprint)
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w") as fp:
+        json.dump(_schemas[fingerprint], fp, indent=2)
+    os.replace(tmp_file, path)
+
+
+def _produce_dict(obj) -> Dict:
+    """
+    Generates the configuration of the option handler in the same format as Actor.to_dict.
+    Requires adams-json module.
+
+    :param obj: the Java option handler
+    :return: the configuration
+    :rtype: dict
+    """
+    from jpype import JClass
+    return json.loads(str(JClass("adams.core.option.JsonProducer")().produce(obj).toJSONString()))
+
+
+def _to_python(value, type_: str):
+    """
+    Turns the (default) value of an option into a JSON-compatible Python value.
+
+    :param value: the Java value
+    :param type_: the type of the option
+    :type type_: str
+    :return: the Python value
+    """
+    from jpype import JClass
+    from pyadams.core.converters import from_java
+    if value is None:
+        return None
+    if type_ == TYPE_OBJECT:
+        if hasattr(value, "getOptionManager"):
+            return _produce_dict(value)
+        return str(JClass("adams.core.option.OptionUtils").getCommandLine(value))
+    if type_ == TYPE_ENUM:
+        return str(value.name())
+    if type_ in [TYPE_BOOLEAN, TYPE_INT, TYPE_FLOAT]:
+        return from_java(value)
+    return str(value)
+
+
+def _option_schema(option) -> Dict:
+    """
+    Generates the schema for the option.
+
+    :param option: the Java option object (adams.core.option.AbstractOption)
+    :return: the schema (keys: property, flag, type, base_class, multiple, default, choices, lower, upper)
+    :rtype: dict
+    """
+    from jpype import JClass
+    from pyadams.core.converters import from_java
+    result = {
+        "property": str(option.getProperty()),
+        "flag": str(option.getCommandline()),
+        "type": TYPE_BOOLEAN,
+        "base_class": None,
+        "multiple": False,
+        "default": None,
+    }
+    if not isinstance(option, JClass("adams.core.option.BooleanOption")):
+        base_class = option.getBaseClass()
+        base = str(base_class.getName())
+        result["base_class"] = base
+        result["multiple"] = bool(option.isMultiple())
+        if isinstance(option, JClass("adams.core.option.ClassOption")):
+            result["type"] = TYPE_OBJECT
+        elif base_class.isEnum():
+            result["type"] = TYPE_ENUM
+            result["choices"] = [str(x.name()) for x in base_class.getEnumConstants()]
+        elif base in INT_CLASSES:
+            result["type"] = TYPE_INT
+        elif base in FLOAT_CLASSES:
+            result["type"] = TYPE_FLOAT
+        elif base == "java.lang.Boolean":
+            result["type"] = TYPE_BOOLEAN
+        else:
+            result["type"] = TYPE_STRING
+        if hasattr(option, "hasLowerBound") and option.hasLowerBound():
+            result["lower"] = from_java(option.getLowerBound())
+        if hasattr(option, "hasUpperBound") and option.hasUpperBound():
+            result["upper"] = from_java(option.getUpperBound())
+
+    default = option.getDefaultValue()
+    if result["multiple"] and (default is not None):
+        result["default"] = [_to_python(x, result["type"]) for x in default]
+    else:
+        result["default"] = _to_python(default, result["type"])
+    return result
+
+
+def _introspect(classname: str) -> Dict:
+    """
+    Extracts the option schema of the class from its option manager.
+
+    :param classname: the class to inspect (must implement adams.core.option.OptionHandler)
+    :type classname: str
+    :return: the schema (keys: classname, layout, options)
+    :rtype: dict
+    """
+    from jpype import JClass
+    obj = JClass(classname)()
+    if not hasattr(obj, "getOptionManager"):
+        raise Exception("Class does not implement adams.core.option.OptionHandler: %s" % classname)
+    # the layout as generated by the JSON producer that Actor.to_dict uses
+    produced = _produce_dict(obj)
+    return {
+        "classname": classname,
+        "layout": LAYOUT_NESTED if isinstance(produced.get(KEY_OPTIONS, None), dict) else LAYOUT_FLAT,
+        "options": [_option_schema(x) for x in obj.getOptionManager().getOptionsList()],
+    }
+
+
+def _extract_schema(classname: str, base_class: Optional[str], fingerprint: str) -> Dict:
+    """
+    Extracts and caches the schema of the class. Only classes that the class index lists as concrete
+    option handlers (and subtypes of the base class, if supplied) get instantiated, for all others
+    an error entry gets cached.
+
+    :param classname: the class to get the schema for
+    :type classname: str
+    :param base_class: the class or interface that the class must be compatible with, None for any option handler
+    :type base_class: str
+    :param fingerprint: the classpath fingerprint
+    :type fingerprint: str
+    :return: the schema, or an error entry (keys: classname, error)
+    :rtype: dict
+    """
+    from pyadams.core.classes import is_subtype
+    if not is_subtype(classname, OPTION_HANDLER):
+        result = {"classname": classname, "error": "Not a concrete option handler: %s" % classname}
+    elif (base_class is not None) and not is_subtype(classname, base_class):
+        result = {"classname": classname, "error": "Not compatible with %s: %s" % (base_class, classname)}
+    else:
+        _logger.debug("Extracting option schema: %s" % classname)
+        try:
+            result = _introspect(classname)
+        except Exception as e:
+            result = {"classname": classname, "error": "Failed to extract option schema for %s: %s" % (classname, str(e))}
+    with _lock:
+        _load(fingerprint)[classname] = result
+        _save(fingerprint)
+    return result
+
+
+def get_schema(classname: str, fingerprint: str = None, base_class: str = None) -> Dict:
+    """
+    Returns the option schema of the class: property name, command-line flag, type (see TYPES),
+    base class, whether it accepts multiple values, default value and, if applicable, the allowed
+    choices and numeric bounds. Default values of nested option handlers are in the same format
+    as Actor.to_dict, other objects are represented by their command-line. Schemas get cached in memory and persisted per classpath fingerprint,
+    i.e., once extracted they are available without the JVM. Only classes that the class index
+    (see pyadams.core.classes) lists as concrete option handlers get instantiated for extracting
+    the schema; failures get cached as well.
+
+    :param classname: the class to get the schema for
+    :type classname: str
+    :param fingerprint: the classpath fingerprint (see jvm.classpath_fingerprint), uses the running JVM's if None
+    :type fingerprint: str
+    :param base_class: the class or interface that the class must be compatible with when extracting the schema, None for any option handler
+    :type base_class: str
+    :return: the schema (keys: classname, options)
+    :rtype: dict
+    """
+    if fingerprint is None:
+        fingerprint = current_fingerprint()
+    with _lock:
+        result = _load(fingerprint).get(classname)
+    if result is None:
+        if (jvm.classpath is None) or (fingerprint != current_fingerprint()):
+            raise Exception("No option schema cached for %s and JVM with matching classpath not running!" % classname)
+        # outside the lock, as it involves the JVM
+        result = _extract_schema(classname, base_class, fingerprint)
+    if "error" in result:
+        raise Exception(result["error"])
+    return result
+
+
+def _find_option(schema: Dict, key: str) -> Optional[Dict]:
+    """
+    Locates the option by property name or command-line flag (with or without leading dash).
+
+    :param schema: the schema to search
+    :type schema: dict
+    :param key: the name/flag to look for
+    :type key: str
+    :return: the option schema, None if not found
+    :rtype: dict
+    """
+    flag = key[1:] if key.startswith("-") else key
+    for option in schema["options"]:
+        if (option["property"] == key) or (option["flag"] == flag):
+            return option
+    return None
+
+
+def _coerce(option: Dict, value, path: str, fingerprint: str, errors: List[str]):
+    """
+    Validates and converts a single value of the option.
+
+    :param option: the option schema
+    :type option: dict
+    :param value: the value to convert
+    :param path: the path of the option, for error messages
+    :type path: str
+    :param fingerprint: the classpath fingerprint
+    :type fingerprint: str
+    :param errors: for collecting the error messages
+    :type errors: list
+    :return: the converted value
+    """
+    type_ = option["type"]
+    try:
+        if type_ == TYPE_BOOLEAN:
+            if isinstance(value, str) and (value.lower() in ["true", "false"]):
+                return value.lower() == "true"
+            if not isinstance(value, bool):
+                raise ValueError("boolean expected")
+            return value
+        if type_ in [TYPE_INT, TYPE_FLOAT]:
+            if isinstance(value, bool):
+                raise ValueError("number expected")
+            result = int(value) if (type_ == TYPE_INT) else float(value)
+            if ("lower" in option) and (result < option["lower"]):
+                raise ValueError("must be at least %s" % str(option["lower"]))
+            if ("upper" in option) and (result > option["upper"]):
+                raise ValueError("must be at most %s" % str(option["upper"]))
+            return result
+        if type_ == TYPE_ENUM:
+            if str(value) not in option["choices"]:
+                raise ValueError("expected one of %s" % ", ".join(option["choices"]))
+            return str(value)
+        if type_ == TYPE_OBJECT:
+            if isinstance(value, dict):
+                return _normalize(value, None, fingerprint, path, errors, base_class=option["base_class"])
+            if not isinstance(value, str):
+                raise ValueError("nested configuration (dict) or command-line (str) expected")
+            # command-line of an option handler? turn it into a configuration as well
+            tokens = shlex.split(value)
+            if len(tokens) == 0:
+                raise ValueError("empty command-line")
+            try:
+                get_schema(tokens[0], fingerprint=fingerprint, base_class=option["base_class"])
+            except Exception:
+                # not a compatible option handler (or schema not available), keep the command-line
+                return value
+            return _normalize(tokens[1:], tokens[0], fingerprint, path, errors, base_class=option["base_class"])
+        if not isinstance(value, (str, int, float)):
+            raise ValueError("string expected")
+        return str(value)
+    except (ValueError, TypeError) as e:
+        errors.append("%s: invalid value %r (%s)" % (path, value, str(e)))
+        return value
+
+
+def _args_to_values(args: List[str], schema: Dict, path: str, errors: List[str]) -> Dict:
+    """
+    Turns the command-line arguments into a dictionary of options (property -> value(s)).
+
+    :param args: the arguments to convert
+    :type args: list
+    :param schema: the schema of the class
+    :type schema: dict
+    :param path: the path of the configuration, for error messages
+    :type path: str
+    :param errors: for collecting the error messages
+    :type errors: list
+    :return: the options
+    :rtype: dict
+    """
+    result = dict()
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        i += 1
+        option = _find_option(schema, arg) if arg.startswith("-") else None
+        if option is None:
+            errors.append("%s: unknown option '%s' for %s" % (path, arg, schema["classname"]))
+            continue
+        # flags (BooleanOption) don't have a base class and take no argument
+        if (option["type"] == TYPE_BOOLEAN) and (option["base_class"] is None):
+            result[option["property"]] = not option["default"]
+            continue
+        if i >= len(args):
+            errors.append("%s: option '%s' is missing its value" % (path, arg))
+            break
+        if option["multiple"]:
+            result.setdefault(option["property"], []).append(args[i])
+        else:
+            result[option["property"]] = args[i]
+        i += 1
+    return result
+
+
+def _config_to_values(config: Dict, schema: Dict) -> Dict:
+    """
+    Returns the options from the configuration, supporting both layouts (options nested below
+    KEY_OPTIONS or alongside KEY_CLASS).
+
+    :param config: the configuration
+    :type config: dict
+    :param schema: the schema of the class
+    :type schema: dict
+    :return: the options (property/flag -> value)
+    :rtype: dict
+    """
+    nested = config.get(KEY_OPTIONS, None)
+    if isinstance(nested, dict) and (_find_option(schema, KEY_OPTIONS) is None):
+        return nested
+    return {k: v for k, v in config.items() if k != KEY_CLASS}
+
+
+def _normalize(config: Union[Dict, List[str]], classname: Optional[str], fingerprint: str, path: str,
+               errors: List[str], base_class: str = None) -> Dict:
+    """
+    Validates and normalizes the configuration.
+
+    :param config: the configuration (see Actor.to_dict) or command-line arguments (see Actor.to_args) to process
+    :type config: dict or list
+    :param classname: the class of the configuration, None to use the KEY_CLASS entry
+    :type classname: str
+    :param fingerprint: the classpath fingerprint
+    :type fingerprint: str
+    :param path: the path of the configuration, for error messages
+    :type path: str
+    :param errors: for collecting the error messages
+    :type errors: list
+    :param base_class: the class or interface that the class must be compatible with, None for any option handler
+    :type base_class: str
+    :return: the normalized configuration
+    :rtype: dict
+    """
+    if classname is None:
+        classname = config.get(KEY_CLASS, None) if isinstance(config, dict) else None
+        if classname is None:
+            errors.append("%s: no '%s' entry" % (path, KEY_CLASS))
+            return config
+    try:
+        schema = get_schema(classname, fingerprint=fingerprint, base_class=base_class)
+    except Exception as e:
+        errors.append("%s: %s" % (path, str(e)))
+        return config
+
+    if isinstance(config, dict):
+        config = _config_to_values(config, schema)
+    else:
+        config = _args_to_values(config, schema, path, errors)
+    values = dict()
+    for key, value in config.items():
+        option = _find_option(schema, key)
+        if option is None:
+            errors.append("%s: unknown option '%s' for %s" % (path, key, classname))
+            continue
+        if option["property"] in values:
+            errors.append("%s: option '%s' specified multiple times" % (path, option["property"]))
+            continue
+        sub_path = path + "." + option["property"]
+        if option["multiple"]:
+            if not isinstance(value, (list, tuple)):
+                value = [value]
+            value = [_coerce(option, x, "%s[%d]" % (sub_path, i), fingerprint, errors) for i, x in enumerate(value)]
+        else:
+            value = _coerce(option, value, sub_path, fingerprint, errors)
+        values[option["property"]] = value
+    options = dict()
+    for option in schema["options"]:
+        options[option["property"]] = values.get(option["property"], option["default"])
+    if schema.get("layout", LAYOUT_NESTED) == LAYOUT_NESTED:
+        return {KEY_CLASS: classname, KEY_OPTIONS: options}
+    result = {KEY_CLASS: classname}
+    result.update(options)
+    return result
+
+
+def _root_path(config: Union[Dict, List[str]], classname: Optional[str]) -> str:
+    """
+    Returns the path to use for the top-level configuration in error messages.
+
+    :param config: the configuration or command-line arguments
+    :type config: dict or list
+    :param classname: the class of the configuration, None to use the KEY_CLASS entry
+    :type classname: str
+    :return: the path
+    :rtype: str
+    """
+    if classname is not None:
+        return classname
+    if isinstance(config, dict):
+        return str(config.get(KEY_CLASS, "config"))
+    return "config"
+
+
+def validate(config: Union[Dict, List[str]], classname: str = None, fingerprint: str = None) -> List[str]:
+    """
+    Validates the configuration against the cached option schemas, without a round trip to the JVM.
+    The configuration is either in the format of Actor.to_dict/apply_dict (options keyed by property
+    name or command-line flag) or a list of command-line arguments as used by Actor.to_args/apply_args.
+    Nested objects are either configurations or command-lines; the latter are only validated if
+    they represent an option handler whose schema is available.
+
+    :param config: the configuration or command-line arguments to validate
+    :type config: dict or list
+    :param classname: the class of the configuration, None to use the KEY_CLASS entry (required for arguments)
+    :type classname: str
+    :param fingerprint: the classpath fingerprint, uses the running JVM's if None
+    :type fingerprint: str
+    :return: the list of errors, empty if valid
+    :rtype: list
+    """
+    if fingerprint is None:
+        fingerprint = current_fingerprint()
+    errors = []
+    _normalize(config, classname, fingerprint, _root_path(config, classname), errors)
+    return errors
+
+
+def normalize(config: Union[Dict, List[str]], classname: str = None, fingerprint: str = None) -> Dict:
+    """
+    Validates the configuration and returns it in the format of Actor.to_dict (suitable for
+    Actor.apply_dict), with all options keyed by property name, the values converted to the
+    option types and the defaults filled in for missing options. Nested option handlers,
+    whether supplied as configuration or command-line, are output as configurations as well.
+
+    :param config: the configuration or command-line arguments to normalize (see validate)
+    :type config: dict or list
+    :param classname: the class of the configuration, None to use the KEY_CLASS entry (required for arguments)
+    :type classname: str
+    :param fingerprint: the classpath fingerprint, uses the running JVM's if None
+    :type fingerprint: str
+    :return: the normalized configuration
+    :rtype: dict
+    """
+    if fingerprint is None:
+        fingerprint = current_fingerprint()
+    errors = []
+    result = _normalize(config, classname, fingerprint, _root_path(config, classname), errors)
+    if len(errors) > 0:
+        raise Exception("Invalid configuration:\n" + "\n".join(errors))
+    return result
+
+
+def clear_cache(fingerprint: str = None):
+    """
+    Removes the cached schemas from memory and disk.
+
+    :param fingerprint: the classpath fingerprint to remove the schemas for, None for all
+    :type fingerprint: str
+    """
+    with _lock:
+        if fingerprint is None:
+            _schemas.clear()
+            if os.path.exists(cache_dir()):
+                for f in os.listdir(cache_dir()):
+                    if f.endswith(".json"):
+                        os.remove(os.path.join(cache_dir(), f))
+        else:
+            _schemas.pop(fingerprint, None)
+            if os.path.exists(_cache_file(fingerprint)):
+                os.remove(_cache_file(fingerprint))
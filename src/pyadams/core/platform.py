@@ -1,4 +1,5 @@
 import sys
+from typing import Optional
 
 
 def is_linux() -> bool:
@@ -29,3 +30,19 @@ def is_mac() -> bool:
     :rtype: bool
     """
     return sys.platform == "darwin"
+
+
+def native_lib_dir() -> Optional[str]:
+    """
+    Returns the name of the sub-directory in ADAMS' lib directory with the platform-specific libraries.
+
+    :return: the name of the sub-directory, None if unsupported platform
+    :rtype: str
+    """
+    if is_linux():
+        return "linux64"
+    elif is_windows():
+        return "windows64"
+    elif is_mac():
+        return "macosx64"
+    return None
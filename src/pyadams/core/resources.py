@@ -0,0 +1,246 @@
+import logging
+import math
+import os
+from typing import Dict, List, Optional
+
+_logger = logging.getLogger(__name__)
+
+PROFILE_AUTO = "auto"
+PROFILE_THROUGHPUT = "throughput"
+PROFILE_LOW_LATENCY = "low-latency"
+PROFILE_SMALL_FOOTPRINT = "small-footprint"
+PROFILES = [
+    PROFILE_AUTO,
+    PROFILE_THROUGHPUT,
+    PROFILE_LOW_LATENCY,
+    PROFILE_SMALL_FOOTPRINT,
+]
+
+HEAP_FRACTIONS = {
+    PROFILE_AUTO: 0.7,
+    PROFILE_THROUGHPUT: 0.75,
+    PROFILE_LOW_LATENCY: 0.6,
+    PROFILE_SMALL_FOOTPRINT: 0.5,
+}
+""" the fraction of the available memory to use for the heap, per profile. """
+
+MIN_HEAP_MB = 64
+""" the minimum heap size in MB. """
+
+SMALL_MEMORY_MB = 1792
+""" below this amount of memory (in MB) the JVM is considered a small one (serial GC). """
+
+CGROUP_DIR = "/sys/fs/cgroup"
+""" the mount point of the cgroup file system. """
+
+PROC_CGROUP = "/proc/self/cgroup"
+""" the file listing the cgroups of this process. """
+
+UNLIMITED = 2 ** 60
+""" values larger than this are considered unlimited by cgroup v1. """
+
+
+def _read(path: str) -> Optional[str]:
+    """
+    Reads the content of the (cgroup) file.
+
+    :param path: the file to read
+    :type path: str
+    :return: the stripped content, None if not available
+    :rtype: str
+    """
+    try:
+        with open(path, "r") as fp:
+            return fp.read().strip()
+    except Exception:
+        return None
+
+
+def _cgroup_paths() -> Dict[str, str]:
+    """
+    Determines the cgroup paths of this process from PROC_CGROUP.
+
+    :return: the paths per v1 controller (eg memory, cpu), the v2 path under the empty string
+    :rtype: dict
+    """
+    result = dict()
+    content = _read(PROC_CGROUP)
+    if content is None:
+        return result
+    for line in content.splitlines():
+        parts = line.split(":", 2)
+        if len(parts) != 3:
+            continue
+        if parts[1] == "":
+            result[""] = parts[2]
+        else:
+            for controller in parts[1].split(","):
+                result[controller] = parts[2]
+    return result
+
+
+def _read_cgroup(controller: str, name: str) -> List[str]:
+    """
+    Reads the cgroup file from the process's own cgroup and its ancestors, up to the root
+    of the mount (the only one available if the path is not visible, eg in containers).
+
+    :param controller: the v1 controller (eg memory), the empty string for v2
+    :type controller: str
+    :param name: the name of the file
+    :type name: str
+    :return: the stripped contents, innermost cgroup first
+    :rtype: list
+    """
+    result = []
+    base = os.path.join(CGROUP_DIR, controller) if (len(controller) > 0) else CGROUP_DIR
+    path = _cgroup_paths().get(controller, "/")
+    while True:
+        value = _read(os.path.join(base, path.strip("/"), name))
+        if value is not None:
+            result.append(value)
+        if path.strip("/") == "":
+            break
+        path = os.path.dirname(path.rstrip("/"))
+    return result
+
+
+def memory_limit() -> Optional[int]:
+    """
+    Returns the memory limit imposed by the process's cgroup or its ancestors (v2 or v1).
+
+    :return: the limit in bytes, None if no limit
+    :rtype: int
+    """
+    # v2
+    values = _read_cgroup("", "memory.max")
+    if len(values) > 0:
+        limits = [int(x) for x in values if x != "max"]
+        return min(limits) if (len(limits) > 0) else None
+    # v1
+    limits = [int(x) for x in _read_cgroup("memory", "memory.limit_in_bytes") if int(x) < UNLIMITED]
+    return min(limits) if (len(limits) > 0) else None
+
+
+def cpu_limit() -> Optional[float]:
+    """
+    Returns the CPU limit (quota/period) imposed by the process's cgroup or its ancestors (v2 or v1).
+
+    :return: the number of CPUs, None if no limit
+    :rtype: float
+    """
+    # v2
+    values = _read_cgroup("", "cpu.max")
+    if len(values) > 0:
+        limits = []
+        for value in values:
+            parts = value.split()
+            if parts[0] != "max":
+                limits.append(int(parts[0]) / int(parts[1]))
+        return min(limits) if (len(limits) > 0) else None
+    # v1
+    quotas = _read_cgroup("cpu", "cpu.cfs_quota_us")
+    periods = _read_cgroup("cpu", "cpu.cfs_period_us")
+    limits = [int(q) / int(p) for q, p in zip(quotas, periods) if int(q) > 0]
+    return min(limits) if (len(limits) > 0) else None
+
+
+def available_memory() -> Optional[int]:
+    """
+    Returns the memory available to this process, i.e., the cgroup limit or the physical memory.
+
+    :return: the memory in bytes, None if it cannot be determined
+    :rtype: int
+    """
+    result = memory_limit()
+    try:
+        physical = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        result = physical if (result is None) else min(result, physical)
+    except (ValueError, OSError, AttributeError):
+        pass
+    return result
+
+
+def available_cpus() -> int:
+    """
+    Returns the number of CPUs available to this process, taking the cgroup limit and CPU affinity into account.
+
+    :return: the number of CPUs
+    :rtype: int
+    """
+    if hasattr(os, "sched_getaffinity"):
+        result = len(os.sched_getaffinity(0))
+    else:
+        result = os.cpu_count() or 1
+    limit = cpu_limit()
+    if limit is not None:
+        result = min(result, max(1, math.ceil(limit)))
+    return result
+
+
+def jvm_settings(profile: str = PROFILE_AUTO) -> Dict:
+    """
+    Derives the JVM settings (heap size, processor count, GC) from the resources available to the process.
+
+    :param profile: the performance profile to use, see PROFILES
+    :type profile: str
+    :return: the settings (keys: profile, memory_mb, cpus, heap_mb, gc, gc_threads, conc_gc_threads)
+    :rtype: dict
+    """
+    if profile not in PROFILES:
+        raise Exception("Unknown profile '%s', available: %s" % (profile, ", ".join(PROFILES)))
+    memory = available_memory()
+    memory_mb = None if (memory is None) else memory // (1024 * 1024)
+    cpus = available_cpus()
+
+    heap_mb = None
+    if memory_mb is not None:
+        heap_mb = max(MIN_HEAP_MB, int(memory_mb * HEAP_FRACTIONS[profile]))
+
+    if profile == PROFILE_THROUGHPUT:
+        gc = "ParallelGC"
+    elif profile == PROFILE_LOW_LATENCY:
+        gc = "G1GC"
+    elif profile == PROFILE_SMALL_FOOTPRINT:
+        gc = "SerialGC"
+    elif (cpus < 2) or ((memory_mb is not None) and (memory_mb < SMALL_MEMORY_MB)):
+        gc = "SerialGC"
+    else:
+        gc = "G1GC"
+
+    return {
+        "profile": profile,
+        "memory_mb": memory_mb,
+        "cpus": cpus,
+        "heap_mb": heap_mb,
+        "gc": gc,
+        "gc_threads": cpus,
+        "conc_gc_threads": max(1, cpus // 4),
+    }
+
+
+def jvm_args(settings: Dict, include_heap: bool = True) -> List[str]:
+    """
+    Turns the settings into JVM arguments.
+
+    :param settings: the settings to convert, see jvm_settings
+    :type settings: dict
+    :param include_heap: whether to include the maximum heap size
+    :type include_heap: bool
+    :return: the arguments
+    :rtype: list
+    """
+    result = []
+    if include_heap and (settings["heap_mb"] is not None):
+        result.append("-Xmx%dm" % settings["heap_mb"])
+    result.append("-XX:ActiveProcessorCount=%d" % settings["cpus"])
+    result.append("-XX:+Use%s" % settings["gc"])
+    if settings["gc"] != "SerialGC":
+        result.append("-XX:ParallelGCThreads=%d" % settings["gc_threads"])
+    if settings["gc"] == "G1GC":
+        result.append("-XX:ConcGCThreads=%d" % settings["conc_gc_threads"])
+    if settings["profile"] == PROFILE_LOW_LATENCY:
+        result.append("-XX:MaxGCPauseMillis=50")
+    elif settings["profile"] == PROFILE_SMALL_FOOTPRINT:
+        result.append("-XX:TieredStopAtLevel=1")
+        result.append("-Xss512k")
+    return result
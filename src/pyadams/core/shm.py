@@ -0,0 +1,298 @@
+import sys
+import weakref
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+TYPED_VIEWS = {
+    "float64": "asDoubleBuffer",
+    "float32": "asFloatBuffer",
+    "int64": "asLongBuffer",
+    "int32": "asIntBuffer",
+    "int16": "asShortBuffer",
+    "uint16": "asCharBuffer",
+}
+""" the methods for obtaining typed views of java.nio.ByteBuffer per numpy dtype. """
+
+
+class SharedArray:
+    """
+    Numpy array backed by a shared memory block, for exchanging large numeric data between the
+    Python driver and worker processes (each running its own JVM) without pickling the data.
+    Only the descriptor (name, shape, dtype) gets pickled; the receiving process attaches to the
+    same memory. Within a process, the memory can be handed to the JVM as a direct
+    java.nio.ByteBuffer (see to_java), i.e., without copying it.
+
+    The lifecycle is explicit: every process calls close() once done, the creating process
+    calls unlink() as well (using the array as context manager does that automatically).
+    Closing removes the storage items placed via put_in_storage and refuses to unmap the memory
+    while the numpy array, views derived from it or Java buffers are still referenced.
+
+    Usage (driver):
+
+        with SharedArray.from_array(data) as shared:
+            pool.submit(work, shared.descriptor).result()
+
+    Usage (worker):
+
+        def work(descriptor):
+            with SharedArray.attach(descriptor) as shared:
+                shared.put_in_storage(flow, "data")
+                ...
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape: Tuple, dtype: str, owner: bool):
+        """
+        Initializes the array. Use create, from_array or attach instead.
+
+        :param shm: the shared memory block
+        :type shm: shared_memory.SharedMemory
+        :param shape: the shape of the array
+        :type shape: tuple
+        :param dtype: the numpy data type of the array
+        :type dtype: str
+        :param owner: whether this process created (and therefore has to unlink) the memory
+        :type owner: bool
+        """
+        import numpy as np
+        self._shm = shm
+        self.shape = tuple(shape)
+        self.dtype = str(np.dtype(dtype))
+        self.owner = owner
+        self._closed = False
+        self._array = None
+        self._java_refs = []
+        self._stored = []
+
+    @classmethod
+    def create(cls, shape: Tuple, dtype: str = "float64", name: str = None) -> 'SharedArray':
+        """
+        Allocates a new (zero-initialized) shared array.
+
+        :param shape: the shape of the array
+        :type shape: tuple
+        :param dtype: the numpy data type
+        :type dtype: str
+        :param name: the name of the shared memory block, generates a unique one if None
+        :type name: str
+        :return: the array
+        :rtype: SharedArray
+        """
+        import numpy as np
+        size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        return SharedArray(shm, shape, dtype, True)
+
+    @classmethod
+    def from_array(cls, array, name: str = None) -> 'SharedArray':
+        """
+        Allocates a new shared array and copies the data into it (the only copy being made).
+
+        :param array: the numpy array to copy
+        :param name: the name of the shared memory block, generates a unique one if None
+        :type name: str
+        :return: the array
+        :rtype: SharedArray
+        """
+        result = SharedArray.create(array.shape, dtype=str(array.dtype), name=name)
+        result.array[...] = array
+        return result
+
+    @classmethod
+    def attach(cls, descriptor: Dict) -> 'SharedArray':
+        """
+        Attaches to the existing shared array.
+
+        :param descriptor: the descriptor of the array (see descriptor property)
+        :type descriptor: dict
+        :return: the array
+        :rtype: SharedArray
+        """
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=descriptor["name"], track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=descriptor["name"])
+            # otherwise the resource tracker of this process unlinks the memory when the process exits
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return SharedArray(shm, descriptor["shape"], descriptor["dtype"], False)
+
+    @property
+    def name(self) -> str:
+        """
+        Returns the name of the shared memory block.
+
+        :return: the name
+        :rtype: str
+        """
+        return self._shm.name
+
+    @property
+    def descriptor(self) -> Dict:
+        """
+        Returns the descriptor for attaching to the array from another process.
+
+        :return: the descriptor (keys: name, shape, dtype)
+        :rtype: dict
+        """
+        return {"name": self.name, "shape": list(self.shape), "dtype": self.dtype}
+
+    @property
+    def array(self):
+        """
+        Returns the numpy array backed by the shared memory. Only a weak reference is kept, as long
+        as the array or any views derived from it are referenced, the shared array cannot be closed.
+
+        :return: the array
+        """
+        import numpy as np
+        if self._closed:
+            raise Exception("Shared array has been closed: %s" % self.name)
+        result = None if (self._array is None) else self._array()
+        if result is None:
+            # numpy does not hold a buffer export on the memory, but views keep this array as their base
+            result = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+            self._array = weakref.ref(result)
+        return result
+
+    @property
+    def closed(self) -> bool:
+        """
+        Returns whether the array has been closed.
+
+        :return: True if closed
+        :rtype: bool
+        """
+        return self._closed
+
+    def to_java(self, typed: bool = False):
+        """
+        Returns the shared memory as direct java.nio.ByteBuffer (in native byte order), without copying it.
+        As long as the buffer is referenced (from Python or Java), the shared array cannot be closed.
+
+        :param typed: whether to return a typed view (eg DoubleBuffer for float64) if available for the dtype
+        :type typed: bool
+        :return: the Java buffer
+        """
+        import jpype.nio
+        from jpype import JClass
+        if self._closed:
+            raise Exception("Shared array has been closed: %s" % self.name)
+        buffer = jpype.nio.convertToDirectBuffer(self._shm.buf)
+        buffer = buffer.order(JClass("java.nio.ByteOrder").nativeOrder())
+        if typed and (self.dtype in TYPED_VIEWS):
+            buffer = getattr(buffer, TYPED_VIEWS[self.dtype])()
+        self._java_refs.append(JClass("java.lang.ref.WeakReference")(buffer))
+        return buffer
+
+    def put_in_storage(self, actor, name: str, typed: bool = False):
+        """
+        Places the shared memory as direct buffer in the storage of the actor's flow, without copying it.
+        The storage item gets removed again when closing the array.
+
+        :param actor: the actor whose flow storage to use
+        :type actor: pyadams.flow.Actor
+        :param name: the name of the storage item
+        :type name: str
+        :param typed: whether to store a typed view (eg DoubleBuffer for float64) if available for the dtype
+        :type typed: bool
+        """
+        buffer = self.to_java(typed=typed)
+        actor.set_storage({name: buffer})
+        self._stored.append((actor, name, self._java_refs[-1]))
+
+    def _remove_from_storage(self):
+        """
+        Removes the buffers placed in storage via put_in_storage, unless they got replaced in the meantime.
+        """
+        from jpype import JClass
+        StorageName = JClass("adams.flow.control.StorageName")
+        System = JClass("java.lang.System")
+        for actor, name, ref in self._stored:
+            try:
+                storage = actor._storage()
+            except Exception:
+                continue
+            buffer = ref.get()
+            item = storage.get(StorageName(name))
+            if (buffer is not None) and (item is not None) and (System.identityHashCode(buffer) == System.identityHashCode(item)):
+                storage.remove(StorageName(name))
+            del buffer, item
+        self._stored = []
+
+    def _in_use(self) -> List[str]:
+        """
+        Determines what still references the shared memory.
+
+        :return: the descriptions of the users, empty if not in use
+        :rtype: list
+        """
+        result = []
+        if (self._array is not None) and (self._array() is not None):
+            result.append("numpy array or views of it")
+        if len(self._java_refs) > 0:
+            from jpype import JClass
+            self._java_refs = [x for x in self._java_refs if x.get() is not None]
+            if len(self._java_refs) > 0:
+                # unreferenced buffers may just not have been collected yet
+                JClass("java.lang.System").gc()
+                self._java_refs = [x for x in self._java_refs if x.get() is not None]
+            if len(self._java_refs) > 0:
+                result.append("%d Java buffer(s)" % len(self._java_refs))
+        return result
+
+    def close(self):
+        """
+        Detaches from the shared memory, removing the buffers placed in storage via put_in_storage first.
+        Fails with an exception (leaving the array open) if the numpy array, any views derived from it or
+        any Java buffers obtained via to_java are still referenced. Subsequent calls have no effect.
+        """
+        if self._closed:
+            return
+        if len(self._stored) > 0:
+            self._remove_from_storage()
+        in_use = self._in_use()
+        if len(in_use) == 0:
+            try:
+                self._shm.close()
+            except BufferError:
+                in_use.append("other exports of the memory")
+        if len(in_use) > 0:
+            raise Exception("Cannot close shared memory %s, still referenced: %s" % (self.name, ", ".join(in_use)))
+        self._closed = True
+        self._array = None
+
+    def unlink(self):
+        """
+        Frees the shared memory block, once all processes have closed it. Only for the creating process.
+        """
+        if not self.owner:
+            raise Exception("Only the creating process can unlink the shared memory: %s" % self.name)
+        self._shm.unlink()
+
+    def __enter__(self):
+        """
+        Enters the context, returns itself.
+
+        :return: itself
+        :rtype: SharedArray
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Leaves the context, closes the array and, if the creating process, frees the memory.
+        """
+        try:
+            self.close()
+        finally:
+            if self.owner:
+                self.unlink()
+        return False
+
+    def __reduce__(self):
+        """
+        Pickles only the descriptor, unpickling attaches to the shared memory.
+
+        :return: the callable and its arguments
+        """
+        return SharedArray.attach, (self.descriptor,)
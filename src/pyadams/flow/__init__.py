@@ -1,4 +1,49 @@
-from ._core import Actor
-from ._actor_utils import is_standalone, is_source, is_transformer, is_sink
-from ._actor_utils import is_actor_handler, is_control_actor, is_interactive
-from ._actor_utils import read, write
+import importlib
+
+_LAZY = {
+    "Actor": "._core",
+    "is_standalone": "._actor_utils",
+    "is_source": "._actor_utils",
+    "is_transformer": "._actor_utils",
+    "is_sink": "._actor_utils",
+    "is_actor_handler": "._actor_utils",
+    "is_control_actor": "._actor_utils",
+    "is_interactive": "._actor_utils",
+    "read": "._actor_utils",
+    "write": "._actor_utils",
+    "SamplingProfiler": "._profiler",
+    "FlowListener": "._listener",
+    "add_flow_listener": "._listener",
+    "remove_flow_listener": "._listener",
+    "BatchedListener": "._listener",
+    "ExecutionEvent": "._listener",
+    "TokenStream": "._stream",
+    "PythonTransformer": "._python_actor",
+    "FlowCache": "._cache",
+}
+""" the names exported by this package and the modules they live in, imported on first access. """
+
+
+def __getattr__(name):
+    """
+    Imports the JPype-based functionality only on first access, to keep "import pyadams.flow" lightweight.
+
+    :param name: the name of the attribute to retrieve
+    :type name: str
+    :return: the attribute
+    """
+    if name in _LAZY:
+        result = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = result
+        return result
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    """
+    Returns the available names, including the lazily imported ones.
+
+    :return: the names
+    :rtype: list
+    """
+    return sorted(list(globals().keys()) + list(_LAZY.keys()))
@@ -1,4 +1,5 @@
 import pyadams.core.jvm as jvm
+import pyadams.core.leaks as leaks
 
 from jpype import JClass
 from pyadams.core.classes import is_instance_of
@@ -106,7 +107,12 @@ def is_interactive(actor: Actor) -> bool:
 
 def read(flow_file: str, errors: MessageCollection = None, warnings: MessageCollection = None) -> Actor:
     """
-    Reads the flow from disk and returns the actor.
+    Reads the flow from disk and returns the actor. The actor can be used as context manager,
+    releasing the Java resources on exit:
+
+        with read("/some/flow.flow") as flow:
+            flow.set_up()
+            flow.execute()
 
     :param flow_file: the flow file to read
     :type flow_file: str
@@ -123,6 +129,7 @@ def read(flow_file: str, errors: MessageCollection = None, warnings: MessageColl
         None if (warnings is None) else warnings.jobject))
     if jvm.is_headless and is_instance_of(result, "adams.flow.control.Flow"):
         result.jobject.setHeadless(True)
+    leaks.track(result, result.classname)
     return result
 
 
@@ -0,0 +1,287 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional
+
+from pyadams.core.project import project_dir
+from ._core import Actor
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+""" the default maximum size of the cache in bytes. """
+
+
+def default_cache_dir() -> str:
+    """
+    Returns the default directory for the flow cache.
+
+    :return: the directory
+    :rtype: str
+    """
+    return os.path.join(project_dir(), "cache", "flows")
+
+
+class FlowCache:
+    """
+    On-disk cache for the results of deterministic flow runs. The key is made up of the flow
+    configuration, the content of the declared input files and the variable values. On a hit,
+    the declared output files get restored from the cache and the flow is not executed at all.
+    Entries get evicted in least-recently-used order once the cache exceeds its maximum size.
+
+    Usage:
+
+        cache = FlowCache(max_size=10 * 1024 * 1024 * 1024)
+        msg = cache.run(flow, inputs=["/data/in.csv"], outputs=["/data/out.csv"], variables={"threshold": 0.5})
+    """
+
+    def __init__(self, cache_dir: str = None, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Initializes the cache.
+
+        :param cache_dir: the directory to store the cached outputs in, uses default_cache_dir() if None
+        :type cache_dir: str
+        :param max_size: the maximum size of the cache in bytes
+        :type max_size: int
+        """
+        self.cache_dir = default_cache_dir() if (cache_dir is None) else cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._file_hashes = dict()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _index_file(self) -> str:
+        """
+        Returns the file with the cache index.
+
+        :return: the file
+        :rtype: str
+        """
+        return os.path.join(self.cache_dir, "index.json")
+
+    def _load_index(self) -> Dict:
+        """
+        Loads the cache index.
+
+        :return: the index (key -> dict with size, accessed, outputs)
+        :rtype: dict
+        """
+        if not os.path.exists(self._index_file()):
+            return dict()
+        with open(self._index_file(), "r") as fp:
+            return json.load(fp)
+
+    def _save_index(self, index: Dict):
+        """
+        Saves the cache index.
+
+        :param index: the index to save
+        :type index: dict
+        """
+        tmp_file = self._index_file() + ".tmp"
+        with open(tmp_file, "w") as fp:
+            json.dump(index, fp, indent=2)
+        os.replace(tmp_file, self._index_file())
+
+    def _hash_file(self, path: str) -> str:
+        """
+        Computes the SHA-256 digest of the file's content, caching it as long as size and modification time don't change.
+
+        :param path: the file to hash
+        :type path: str
+        :return: the hex digest
+        :rtype: str
+        """
+        st = os.stat(path)
+        cache_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        if cache_key not in self._file_hashes:
+            digest = hashlib.sha256()
+            with open(path, "rb") as fp:
+                while True:
+                    data = fp.read(1024 * 1024)
+                    if len(data) == 0:
+                        break
+                    digest.update(data)
+            self._file_hashes[cache_key] = digest.hexdigest()
+        return self._file_hashes[cache_key]
+
+    def key(self, actor: Actor, inputs: List[str] = None, variables: Dict = None, outputs: List[str] = None) -> str:
+        """
+        Generates the cache key for the flow run.
+
+        :param actor: the flow to run
+        :type actor: Actor
+        :param inputs: the input files that the flow reads
+        :type inputs: list
+        :param variables: the variables (name -> value) to set before executing the flow
+        :type variables: dict
+        :param outputs: the output files that the flow generates (order matters)
+        :type outputs: list
+        :return: the key
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        digest.update(actor.classname.encode("utf-8"))
+        for arg in actor.to_args():
+            digest.update(b"\0" + str(arg).encode("utf-8"))
+        if inputs is not None:
+            for path in sorted(inputs):
+                digest.update(("\1%s=%s" % (os.path.abspath(path), self._hash_file(path))).encode("utf-8"))
+        if variables is not None:
+            for name in sorted(variables):
+                digest.update(("\2%s=%s" % (name, str(variables[name]))).encode("utf-8"))
+        if outputs is not None:
+            for path in outputs:
+                digest.update(("\3%s" % os.path.abspath(path)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _evict(self, index: Dict):
+        """
+        Removes the least recently used entries until the cache is within its size limit.
+
+        :param index: the index to update
+        :type index: dict
+        """
+        total = sum(x["size"] for x in index.values())
+        for key in sorted(index, key=lambda k: index[k]["accessed"]):
+            if total <= self.max_size:
+                break
+            _logger.debug("Evicting: %s" % key)
+            total -= index[key]["size"]
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            del index[key]
+            self.evictions += 1
+
+    def _restore(self, key: str, outputs: List[str]) -> bool:
+        """
+        Restores the cached output files.
+
+        :param key: the key of the entry
+        :type key: str
+        :param outputs: the paths to restore the outputs to
+        :type outputs: list
+        :return: True if successfully restored, False if the entry is not available
+        :rtype: bool
+        """
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                return False
+            entry_dir = os.path.join(self.cache_dir, key)
+            if index[key]["outputs"] != [os.path.abspath(x) for x in outputs]:
+                return False
+            for i, path in enumerate(outputs):
+                cached = os.path.join(entry_dir, str(i))
+                if not os.path.exists(cached):
+                    del index[key]
+                    self._save_index(index)
+                    return False
+                shutil.copyfile(cached, path)
+            index[key]["accessed"] = time.time()
+            self._save_index(index)
+            return True
+
+    def _store(self, key: str, outputs: List[str]):
+        """
+        Stores the output files in the cache.
+
+        :param key: the key of the entry
+        :type key: str
+        :param outputs: the output files to store
+        :type outputs: list
+        """
+        with self._lock:
+            entry_dir = os.path.join(self.cache_dir, key)
+            os.makedirs(entry_dir, exist_ok=True)
+            size = 0
+            for i, path in enumerate(outputs):
+                shutil.copyfile(path, os.path.join(entry_dir, str(i)))
+                size += os.path.getsize(path)
+            index = self._load_index()
+            index[key] = {"size": size, "accessed": time.time(), "outputs": [os.path.abspath(x) for x in outputs]}
+            self._evict(index)
+            self._save_index(index)
+
+    def run(self, actor: Actor, inputs: List[str] = None, outputs: List[str] = None, variables: Dict = None) -> Optional[str]:
+        """
+        Runs the flow (set up, execute, wrap up, clean up) unless the outputs are available from the cache.
+        Only successful runs get cached.
+
+        :param actor: the flow to run
+        :type actor: Actor
+        :param inputs: the input files that the flow reads
+        :type inputs: list
+        :param outputs: the output files that the flow generates
+        :type outputs: list
+        :param variables: the variables (name -> value) to set before executing the flow
+        :type variables: dict
+        :return: None if successful, otherwise error message
+        :rtype: str
+        """
+        if outputs is None:
+            outputs = []
+        key = self.key(actor, inputs=inputs, variables=variables, outputs=outputs)
+        if self._restore(key, outputs):
+            _logger.info("Cache hit: %s" % key)
+            self.hits += 1
+            return None
+        _logger.info("Cache miss: %s" % key)
+        self.misses += 1
+
+        if variables is not None:
+            jvars = actor.jobject.getVariables()
+            for name in variables:
+                jvars.set(name, str(variables[name]))
+        result = actor.set_up()
+        if result is None:
+            result = actor.execute()
+        actor.wrap_up()
+        actor.clean_up()
+        if result is not None:
+            return result
+
+        missing = [x for x in outputs if not os.path.exists(x)]
+        if len(missing) > 0:
+            _logger.warning("Not caching result, outputs missing: %s" % ", ".join(missing))
+        else:
+            self._store(key, outputs)
+        return None
+
+    def invalidate(self, key: str = None):
+        """
+        Removes the specified entry or all entries from the cache.
+
+        :param key: the key of the entry to remove, None to remove all
+        :type key: str
+        """
+        with self._lock:
+            index = self._load_index()
+            keys = list(index.keys()) if (key is None) else [key]
+            for k in keys:
+                shutil.rmtree(os.path.join(self.cache_dir, k), ignore_errors=True)
+                index.pop(k, None)
+            self._save_index(index)
+
+    def stats(self) -> Dict:
+        """
+        Returns statistics about the cache.
+
+        :return: the statistics (hits, misses, evictions, entries, size)
+        :rtype: dict
+        """
+        with self._lock:
+            index = self._load_index()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(index),
+            "size": sum(x["size"] for x in index.values()),
+        }
@@ -2,8 +2,73 @@ import json
 
 import jpype
 from jpype import JClass
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from pyadams.core.classes import JavaObject
+import pyadams.core.leaks as leaks
+
+
+def _reconfigure_actor(current, new) -> Tuple[bool, List]:
+    """
+    Compares the current Java actor with the new one, replacing changed child actors in place.
+
+    :param current: the current Java actor
+    :param new: the Java actor with the new configuration
+    :return: whether the current actor itself needs replacing and the list of child actors that were replaced
+    :rtype: tuple
+    """
+    if current.getClass().getName() != new.getClass().getName():
+        return True, []
+    if not isinstance(current, JClass("adams.flow.core.ActorHandler")):
+        return str(current.toCommandLine()) != str(new.toCommandLine()), []
+    if current.size() != new.size():
+        return True, []
+
+    replaced = []
+    pending = []
+    for i in range(current.size()):
+        replace, sub_replaced = _reconfigure_actor(current.get(i), new.get(i))
+        if replace:
+            pending.append(i)
+        else:
+            replaced.extend(sub_replaced)
+    if len(pending) > 0:
+        if not isinstance(current, JClass("adams.flow.core.MutableActorHandler")):
+            return True, []
+        for i in pending:
+            old = current.get(i)
+            child = new.get(i)
+            current.set(i, child)
+            old.cleanUp()
+            replaced.append(child)
+    # own options changed?
+    if str(current.toCommandLine()) != str(new.toCommandLine()):
+        return True, []
+    return False, replaced
+
+
+def _affects_callable_actors(replaced: List) -> bool:
+    """
+    Checks whether any of the replaced actors is a callable actor, i.e., below a CallableActors
+    standalone, or is/contains a CallableActors standalone.
+
+    :param replaced: the Java actors that were replaced
+    :type replaced: list
+    :return: True if callable actors were affected
+    :rtype: bool
+    """
+    CallableActors = JClass("adams.flow.standalone.CallableActors")
+    ActorHandler = JClass("adams.flow.core.ActorHandler")
+    for actor in replaced:
+        if isinstance(actor.getParent(), CallableActors):
+            return True
+        todo = [actor]
+        while len(todo) > 0:
+            current = todo.pop()
+            if isinstance(current, CallableActors):
+                return True
+            if isinstance(current, ActorHandler):
+                todo.extend(current.get(i) for i in range(current.size()))
+    return False
 
 
 class Actor(JavaObject):
@@ -22,12 +87,16 @@ class Actor(JavaObject):
         :param apply_args: the command-line options to apply
         :type apply_args: list
         """
+        owned = False
         if (jobject is None) and (classname is not None):
             jobject = JClass(classname)()
+            owned = True
         if jobject is None:
             raise Exception("Either jobject or classname must be provided!")
         self.enforce_type(jobject, "adams.flow.core.Actor")
         super().__init__(jobject)
+        if owned:
+            leaks.track(self, classname)
         if apply_dict is not None:
             self.apply_dict(apply_dict)
         elif apply_json is not None:
@@ -65,6 +134,46 @@ class Actor(JavaObject):
         """
         self.jobject.cleanUp()
 
+    @property
+    def closed(self) -> bool:
+        """
+        Returns whether the actor has been closed, i.e., the Java object released.
+
+        :return: True if closed
+        :rtype: bool
+        """
+        return self.jobject is None
+
+    def close(self):
+        """
+        Releases the Java resources: calls wrapUp() and cleanUp() and drops the reference to the
+        Java object. The actor cannot be used afterwards. Subsequent calls have no effect.
+        """
+        if self.jobject is None:
+            return
+        try:
+            self.wrap_up()
+            self.clean_up()
+        finally:
+            self.jobject = None
+            leaks.untrack(self)
+
+    def __enter__(self):
+        """
+        Enters the context, returns itself.
+
+        :return: itself
+        :rtype: Actor
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Leaves the context, closes the actor.
+        """
+        self.close()
+        return False
+
     def to_commandline(self) -> str:
         """
         Calls the toCommandLine() method.
@@ -210,6 +319,133 @@ class Actor(JavaObject):
         else:
             self.jobject.stopExecution(msg)
 
+    def add_execution_listener(self, callback, interval: float = 1.0, buffer_size: int = 10000):
+        """
+        Adds a listener to the flow that this actor belongs to, which delivers the execution events
+        (actor started/finished/failed, token input/output) in batches to the callback, from a separate
+        thread. The callback receives the list of events and the number of events that got dropped
+        because the buffer was full. Must be called before the flow gets executed.
+
+        :param callback: the function to deliver the batches to, see pyadams.flow.BatchedListener
+        :param interval: the interval in seconds between deliveries
+        :type interval: float
+        :param buffer_size: the maximum number of events to buffer between deliveries
+        :type buffer_size: int
+        :return: the listener, required for removing it again
+        :rtype: BatchedListener
+        """
+        from ._listener import BatchedListener, add_flow_listener
+        result = BatchedListener(callback, interval=interval, buffer_size=buffer_size)
+        add_flow_listener(self, result)
+        result.start()
+        return result
+
+    def remove_execution_listener(self, listener):
+        """
+        Removes the listener again, delivering any remaining events.
+
+        :param listener: the listener to remove, as returned by add_execution_listener
+        :type listener: BatchedListener
+        """
+        from ._listener import remove_flow_listener
+        remove_flow_listener(self, listener)
+        listener.stop()
+
+    def _storage(self):
+        """
+        Returns the storage of the flow this actor belongs to.
+
+        :return: the Java storage object (adams.flow.control.Storage)
+        """
+        handler = self.jobject.getStorageHandler()
+        if handler is None:
+            raise Exception("Actor has no storage handler (not part of a flow?): %s" % self.name)
+        return handler.getStorage()
+
+    def get_variables(self, names: List[str] = None) -> Dict[str, str]:
+        """
+        Returns the values of the variables. Please note that ADAMS' Variables class offers
+        no bulk accessor, i.e., this makes one call into the JVM per variable (plus one for
+        obtaining all the names if none are supplied).
+
+        :param names: the names of the variables to retrieve, None for all
+        :type names: list
+        :return: the variables (name -> value), unknown variables are omitted
+        :rtype: dict
+        """
+        jvars = self.jobject.getVariables()
+        if names is None:
+            names = [str(x) for x in jvars.nameSet().toArray()]
+        result = dict()
+        for name in names:
+            value = jvars.get(name)
+            if value is not None:
+                result[name] = str(value)
+        return result
+
+    def set_variables(self, variables: Dict):
+        """
+        Sets the values of the variables, one call into the JVM per variable (ADAMS' Variables
+        class offers no bulk accessor). Variables are strings in ADAMS,
+        therefore lists and tuples get turned into comma-separated strings and all other
+        values get converted using str().
+
+        :param variables: the variables (name -> value) to set
+        :type variables: dict
+        """
+        jvars = self.jobject.getVariables()
+        for name, value in variables.items():
+            if isinstance(value, (list, tuple)):
+                value = ",".join(str(x) for x in value)
+            jvars.set(name, str(value))
+
+    def get_storage(self, names: List[str] = None, convert: bool = True) -> Dict:
+        """
+        Returns the items from storage. Please note that ADAMS' Storage class offers no bulk
+        accessor, i.e., this makes one call into the JVM per item (plus one for obtaining all
+        the names if none are supplied). The values get converted with cached converters.
+
+        :param names: the names of the storage items to retrieve, None for all
+        :type names: list
+        :param convert: whether to convert the Java objects into Python ones (see pyadams.core.converters.from_java)
+        :type convert: bool
+        :return: the storage items (name -> value), unknown items are omitted
+        :rtype: dict
+        """
+        from pyadams.core.converters import from_java
+        storage = self._storage()
+        StorageName = JClass("adams.flow.control.StorageName")
+        if names is None:
+            snames = list(storage.keySet().toArray())
+        else:
+            snames = [StorageName(x) for x in names]
+        result = dict()
+        for sname in snames:
+            value = storage.get(sname)
+            if value is not None:
+                result[str(sname.getValue())] = from_java(value) if convert else value
+        return result
+
+    def set_storage(self, items: Dict, by_reference: bool = False):
+        """
+        Stores the items, converting Python values into Java ones with cached converters
+        (see pyadams.core.converters.to_java). ADAMS' Storage class offers no bulk accessor,
+        i.e., this makes one call into the JVM per item; large numpy arrays can be passed
+        by reference to avoid copying them.
+
+        :param items: the items (name -> value) to store
+        :type items: dict
+        :param by_reference: whether to pass contiguous numpy arrays as direct ByteBuffer sharing the
+                             memory with the array rather than copying them; the arrays must be kept
+                             alive as long as the flow uses the buffers
+        :type by_reference: bool
+        """
+        from pyadams.core.converters import to_java
+        storage = self._storage()
+        StorageName = JClass("adams.flow.control.StorageName")
+        for name, value in items.items():
+            storage.put(StorageName(name), to_java(value, by_reference=by_reference))
+
     def apply_dict(self, d: Dict):
         """
         Configures itself using the dictionary of options (in JSON format).
@@ -250,6 +486,52 @@ class Actor(JavaObject):
         result.apply_dict(d)
         return result
 
+    def reconfigure(self, d: Dict) -> List[str]:
+        """
+        Applies the new configuration (in JSON format, see to_dict) incrementally: the new option tree
+        is compared with the current one and only the actors whose options changed get replaced and
+        set up again, rather than the whole flow. Actors using callable actors get set up again as
+        well if any callable actor changed. If the root actor itself changed, the whole flow gets
+        replaced and set up.
+        Requires adams-json module.
+
+        :param d: the dictionary with the new options
+        :type d: dict
+        :return: the full names of the actors that were set up again
+        :rtype: list
+        """
+        if self.to_dict() == d:
+            return []
+        # created from the Java object, as the temporary wrapper does not own the adopted actors
+        new = Actor(JClass(self.classname)(), apply_dict=d)
+        replace, replaced = _reconfigure_actor(self.jobject, new.jobject)
+        if replace:
+            if hasattr(self.jobject, "setHeadless"):
+                new.jobject.setHeadless(self.jobject.isHeadless())
+            self.jobject.cleanUp()
+            self.jobject = new.jobject
+            replaced = [self.jobject]
+
+        # dependents: actors referencing callable actors
+        if not replace and _affects_callable_actors(replaced):
+            CallableActorUser = JClass("adams.flow.core.CallableActorUser")
+            ActorHandler = JClass("adams.flow.core.ActorHandler")
+            todo = [self.jobject]
+            while len(todo) > 0:
+                actor = todo.pop()
+                if isinstance(actor, CallableActorUser) and (actor not in replaced):
+                    replaced.append(actor)
+                if isinstance(actor, ActorHandler):
+                    todo.extend(actor.get(i) for i in range(actor.size()))
+
+        result = []
+        for actor in replaced:
+            msg = actor.setUp()
+            if msg is not None:
+                raise Exception("Failed to set up %s: %s" % (actor.getFullName(), msg))
+            result.append(str(actor.getFullName()))
+        return result
+
     def apply_json(self, j: str):
         """
         Configures itself from a JSON string.
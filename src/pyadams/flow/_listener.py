@@ -0,0 +1,518 @@
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+from typing import Callable, List
+
+from jpype import JClass, JProxy
+from ._core import Actor
+
+_logger = logging.getLogger(__name__)
+
+_dispatchers = dict()
+""" the dispatchers per flow (Java object of the root actor). """
+
+_lock = threading.Lock()
+""" for synchronizing access to the dispatchers. """
+
+
+class FlowListener:
+    """
+    Ancestor for Python-side flow execution listeners. The methods get called from the
+    Java threads that execute the flow and receive the raw Java objects (actor, token),
+    so they should not perform any expensive work. Please note that every event of every
+    actor crosses into Python (acquiring the GIL), for the tokens arriving at a single actor
+    use TokenStream instead.
+    """
+
+    def start_listening(self):
+        """
+        Gets called when the flow starts executing.
+        """
+        pass
+
+    def finish_listening(self):
+        """
+        Gets called when the flow finished executing.
+        """
+        pass
+
+    def pre_execute(self, actor):
+        """
+        Gets called before the actor gets executed.
+
+        :param actor: the Java actor object
+        """
+        pass
+
+    def post_execute(self, actor):
+        """
+        Gets called after the actor was executed.
+
+        :param actor: the Java actor object
+        """
+        pass
+
+    def pre_input(self, actor, token):
+        """
+        Gets called before the token gets passed to the actor.
+
+        :param actor: the Java actor object
+        :param token: the Java token object
+        """
+        pass
+
+    def post_input(self, actor):
+        """
+        Gets called after the token was passed to the actor.
+
+        :param actor: the Java actor object
+        """
+        pass
+
+    def pre_output(self, actor):
+        """
+        Gets called before the actor produces a token.
+
+        :param actor: the Java actor object
+        """
+        pass
+
+    def post_output(self, actor, token):
+        """
+        Gets called after the actor produced a token.
+
+        :param actor: the Java actor object
+        :param token: the Java token object
+        """
+        pass
+
+
+class _Dispatcher:
+    """
+    Implements the adams.flow.execution.FlowExecutionListener interface and forwards
+    the events to the registered Python listeners and the flow's previous listener.
+    """
+
+    def __init__(self, flow, previous, previous_enabled):
+        """
+        Initializes the dispatcher.
+
+        :param flow: the Java flow object
+        :param previous: the Java listener that was set previously
+        :param previous_enabled: whether listening was enabled previously
+        :type previous_enabled: bool
+        """
+        self.flow = flow
+        self.previous = previous
+        self.previous_enabled = previous_enabled
+        self.listeners = []
+        self.owner = None
+        if (previous is not None) and previous.getClass().getName() == "adams.flow.execution.NullListener":
+            self.forward = None
+        else:
+            self.forward = previous
+        self.proxy = JProxy("adams.flow.execution.FlowExecutionListener", inst=self)
+
+    def _notify(self, method, *args):
+        """
+        Calls the specified method of all the Python listeners.
+
+        :param method: the name of the method to call
+        :type method: str
+        :param args: the arguments for the method
+        """
+        for listener in list(self.listeners):
+            try:
+                getattr(listener, method)(*args)
+            except Exception:
+                _logger.exception("Listener %s failed to process '%s'!" % (str(listener), method))
+
+    def setOwner(self, owner):
+        """
+        Sets the owning flow.
+
+        :param owner: the Java flow object
+        """
+        self.owner = owner
+        if self.forward is not None:
+            self.forward.setOwner(owner)
+
+    def getOwner(self):
+        """
+        Returns the owning flow.
+
+        :return: the Java flow object
+        """
+        return self.owner
+
+    def startListening(self):
+        """
+        Gets called when the flow starts executing.
+        """
+        if self.forward is not None:
+            self.forward.startListening()
+        self._notify("start_listening")
+
+    def finishListening(self):
+        """
+        Gets called when the flow finished executing.
+        """
+        if self.forward is not None:
+            self.forward.finishListening()
+        self._notify("finish_listening")
+
+    def preExecute(self, actor):
+        """
+        Gets called before the actor gets executed.
+
+        :param actor: the Java actor object
+        """
+        if self.forward is not None:
+            self.forward.preExecute(actor)
+        self._notify("pre_execute", actor)
+
+    def postExecute(self, actor):
+        """
+        Gets called after the actor was executed.
+
+        :param actor: the Java actor object
+        """
+        if self.forward is not None:
+            self.forward.postExecute(actor)
+        self._notify("post_execute", actor)
+
+    def preInput(self, actor, token):
+        """
+        Gets called before the token gets passed to the actor.
+
+        :param actor: the Java actor object
+        :param token: the Java token object
+        """
+        if self.forward is not None:
+            self.forward.preInput(actor, token)
+        self._notify("pre_input", actor, token)
+
+    def postInput(self, actor):
+        """
+        Gets called after the token was passed to the actor.
+
+        :param actor: the Java actor object
+        """
+        if self.forward is not None:
+            self.forward.postInput(actor)
+        self._notify("post_input", actor)
+
+    def preOutput(self, actor):
+        """
+        Gets called before the actor produces a token.
+
+        :param actor: the Java actor object
+        """
+        if self.forward is not None:
+            self.forward.preOutput(actor)
+        self._notify("pre_output", actor)
+
+    def postOutput(self, actor, token):
+        """
+        Gets called after the actor produced a token.
+
+        :param actor: the Java actor object
+        :param token: the Java token object
+        """
+        if self.forward is not None:
+            self.forward.postOutput(actor, token)
+        self._notify("post_output", actor, token)
+
+    def hasListenerPanel(self):
+        """
+        Returns whether a panel is available.
+
+        :return: always False
+        """
+        return False
+
+    def newListenerPanel(self):
+        """
+        Returns the panel for displaying information.
+
+        :return: always None
+        """
+        return None
+
+    def getListenerPanelTitle(self):
+        """
+        Returns the title for the panel.
+
+        :return: the title
+        """
+        return "pyadams"
+
+    def globalInfo(self):
+        """
+        Returns a description of the listener.
+
+        :return: the description
+        """
+        return "Forwards flow execution events to pyadams."
+
+    def toCommandLine(self):
+        """
+        Returns the command-line, uses the null listener as the proxy cannot be instantiated from a command-line.
+
+        :return: the command-line
+        """
+        return "adams.flow.execution.NullListener"
+
+    def cleanUpOptions(self):
+        """
+        Cleans up the options.
+        """
+        pass
+
+    def destroy(self):
+        """
+        Frees up resources.
+        """
+        pass
+
+
+def _get_flow(actor: Actor):
+    """
+    Returns the Java flow object that the actor belongs to.
+
+    :param actor: the actor to get the flow for
+    :type actor: Actor
+    :return: the Java object of the root actor
+    """
+    flow = actor.jobject.getRoot()
+    if flow is None:
+        flow = actor.jobject
+    if not hasattr(flow, "setFlowExecutionListener"):
+        raise Exception("Root actor does not support flow execution listeners: %s" % flow.getClass().getName())
+    return flow
+
+
+def add_flow_listener(actor: Actor, listener: FlowListener):
+    """
+    Adds the listener to the flow that the actor belongs to. Must be called before the flow gets executed.
+
+    :param actor: the flow or any of its actors
+    :type actor: Actor
+    :param listener: the listener to add
+    :type listener: FlowListener
+    """
+    flow = _get_flow(actor)
+    with _lock:
+        dispatcher = _dispatchers.get(flow)
+        if dispatcher is None:
+            dispatcher = _Dispatcher(flow, flow.getFlowExecutionListener(), flow.getFlowExecutionListeningEnabled())
+            flow.setFlowExecutionListener(dispatcher.proxy)
+            flow.setFlowExecutionListeningEnabled(True)
+            _dispatchers[flow] = dispatcher
+        dispatcher.listeners.append(listener)
+
+
+def remove_flow_listener(actor: Actor, listener: FlowListener):
+    """
+    Removes the listener from the flow that the actor belongs to. Restores the flow's
+    original listener once the last Python listener got removed.
+
+    :param actor: the flow or any of its actors
+    :type actor: Actor
+    :param listener: the listener to remove
+    :type listener: FlowListener
+    """
+    flow = _get_flow(actor)
+    with _lock:
+        dispatcher = _dispatchers.get(flow)
+        if (dispatcher is None) or (listener not in dispatcher.listeners):
+            return
+        dispatcher.listeners.remove(listener)
+        if len(dispatcher.listeners) == 0:
+            flow.setFlowExecutionListener(dispatcher.previous)
+            flow.setFlowExecutionListeningEnabled(dispatcher.previous_enabled)
+            del _dispatchers[flow]
+
+
+EVENT_STARTED = "started"
+EVENT_FINISHED = "finished"
+EVENT_FAILED = "failed"
+EVENT_INPUT = "input"
+EVENT_OUTPUT = "output"
+
+ExecutionEvent = namedtuple("ExecutionEvent", ["timestamp", "kind", "actor", "thread"])
+""" an execution event: time (seconds since epoch), kind (EVENT_*), full name of the actor, name of the Java thread. """
+
+DEFAULT_INTERVAL = 1.0
+""" the default interval in seconds between deliveries of events. """
+
+DEFAULT_BUFFER_SIZE = 10000
+""" the default number of events to buffer between deliveries. """
+
+
+class BatchedListener(FlowListener):
+    """
+    Records the execution events in a ring buffer and delivers them in batches to the callback
+    from a separate thread, i.e., the callback never runs on the threads that execute the flow.
+    If the callback cannot keep up, the oldest events get overwritten and the number of dropped
+    events gets reported with the next batch. The callback receives the list of ExecutionEvent
+    tuples and the number of events dropped since the previous delivery.
+
+    Recording an event only stores the raw Java actor and Java thread, the names get resolved
+    (the actor names cached) in the delivery thread. An actor counts as failed if it has a stop
+    message right after its execution, which gets checked when recording the event (as the state
+    may have changed by the time of delivery).
+    """
+
+    def __init__(self, callback: Callable[[List[ExecutionEvent], int], None], interval: float = DEFAULT_INTERVAL,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        Initializes the listener.
+
+        :param callback: the function to deliver the batches to
+        :param interval: the interval in seconds between deliveries
+        :type interval: float
+        :param buffer_size: the maximum number of events to buffer between deliveries
+        :type buffer_size: int
+        """
+        if interval <= 0:
+            raise Exception("Interval must be greater than 0: %f" % interval)
+        if buffer_size < 1:
+            raise Exception("Buffer size must be at least 1: %d" % buffer_size)
+        self.callback = callback
+        self.interval = interval
+        self.buffer_size = buffer_size
+        self.dropped = 0
+        self._buffer = deque(maxlen=buffer_size)
+        self._buffer_lock = threading.Lock()
+        self._names = dict()
+        self._current_thread = JClass("java.lang.Thread").currentThread
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _record(self, kind: str, actor):
+        """
+        Adds the event to the ring buffer.
+
+        :param kind: the type of event
+        :type kind: str
+        :param actor: the Java actor object
+        """
+        # threading.current_thread() only returns dummy threads for the flow's Java threads
+        event = (time.time(), kind, actor, self._current_thread())
+        with self._buffer_lock:
+            if len(self._buffer) == self.buffer_size:
+                self.dropped += 1
+            self._buffer.append(event)
+
+    def _actor_name(self, actor) -> str:
+        """
+        Returns the full name of the actor.
+
+        :param actor: the Java actor object
+        :return: the full name
+        :rtype: str
+        """
+        result = self._names.get(actor)
+        if result is None:
+            result = str(actor.getFullName())
+            self._names[actor] = result
+        return result
+
+    def deliver(self):
+        """
+        Delivers the buffered events to the callback.
+        """
+        with self._buffer_lock:
+            events = list(self._buffer)
+            self._buffer.clear()
+            dropped = self.dropped
+            self.dropped = 0
+        if (len(events) == 0) and (dropped == 0):
+            return
+        batch = []
+        threads = dict()
+        for timestamp, kind, actor, thread in events:
+            name = threads.get(thread)
+            if name is None:
+                name = str(thread.getName())
+                threads[thread] = name
+            batch.append(ExecutionEvent(timestamp, kind, self._actor_name(actor), name))
+        try:
+            self.callback(batch, dropped)
+        except Exception:
+            _logger.exception("Callback failed to process execution events!")
+
+    def _run(self):
+        """
+        Delivers the events periodically until stopped.
+        """
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.deliver()
+
+    def start(self):
+        """
+        Starts the delivery thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pyadams-execution-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the delivery thread, delivering any remaining events.
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        self.deliver()
+        self._names.clear()
+
+    def finish_listening(self):
+        """
+        Triggers the delivery of the remaining events once the flow finished.
+        """
+        self._wake.set()
+
+    def pre_execute(self, actor):
+        """
+        Records the actor being started.
+
+        :param actor: the Java actor object
+        """
+        self._record(EVENT_STARTED, actor)
+
+    def post_execute(self, actor):
+        """
+        Records the actor having finished or failed.
+
+        :param actor: the Java actor object
+        """
+        self._record(EVENT_FAILED if (actor.getStopMessage() is not None) else EVENT_FINISHED, actor)
+
+    def pre_input(self, actor, token):
+        """
+        Records the actor receiving a token.
+
+        :param actor: the Java actor object
+        :param token: the Java token object
+        """
+        self._record(EVENT_INPUT, actor)
+
+    def post_output(self, actor, token):
+        """
+        Records the actor producing a token.
+
+        :param actor: the Java actor object
+        :param token: the Java token object
+        """
+        self._record(EVENT_OUTPUT, actor)
@@ -0,0 +1,232 @@
+import logging
+import os
+import re
+import sys
+import threading
+from typing import Dict, List
+
+from jpype import JClass
+
+_logger = logging.getLogger(__name__)
+
+OTHER_STACK = "[other]"
+""" the collapsed stack that samples get aggregated under once max_stacks has been reached. """
+
+
+class SamplingProfiler:
+    """
+    Sampling profiler that periodically captures the Java stack traces of the flow threads
+    (via the ThreadMXBean) while the flow executes and merges them with the Python stack of
+    the calling thread. The samples are aggregated as collapsed stacks, which can be turned
+    into flame graphs with tools like flamegraph.pl or speedscope.
+
+    Usage:
+
+        with SamplingProfiler(interval=0.01) as profiler:
+            actor.execute()
+        profiler.write_collapsed("/tmp/flow.collapsed")
+    """
+
+    def __init__(self, interval: float = 0.01, include_threads: str = None, exclude_threads: str = None,
+                 runnable_only: bool = True, max_depth: int = 128, max_stacks: int = 10000):
+        """
+        Initializes the profiler.
+
+        :param interval: the sampling interval in seconds
+        :type interval: float
+        :param include_threads: the regular expression that Java thread names must match, None for all
+        :type include_threads: str
+        :param exclude_threads: the regular expression for Java thread names to skip, None to skip none
+        :type exclude_threads: str
+        :param runnable_only: whether to only sample threads that are in RUNNABLE state (the calling thread is always sampled)
+        :type runnable_only: bool
+        :param max_depth: the maximum number of Java frames to capture per thread
+        :type max_depth: int
+        :param max_stacks: the maximum number of distinct collapsed stacks to keep, any further stacks get counted under OTHER_STACK
+        :type max_stacks: int
+        """
+        if interval <= 0:
+            raise Exception("Sampling interval must be greater than 0: %s" % str(interval))
+        if max_stacks < 1:
+            raise Exception("Maximum number of stacks must be at least 1: %d" % max_stacks)
+        self.interval = interval
+        self.include_threads = None if (include_threads is None) else re.compile(include_threads)
+        self.exclude_threads = None if (exclude_threads is None) else re.compile(exclude_threads)
+        self.runnable_only = runnable_only
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self._stacks = dict()
+        self._num_samples = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._caller_ident = None
+        self._caller_java_id = None
+        self._sampler_java_id = None
+        self._mxbean = None
+
+    def _accept_thread(self, info) -> bool:
+        """
+        Checks whether the thread should be sampled.
+
+        :param info: the Java ThreadInfo object
+        :return: True if to sample
+        :rtype: bool
+        """
+        if info.getThreadId() == self._caller_java_id:
+            return True
+        # the sampling thread itself only ever shows the MXBean call
+        if info.getThreadId() == self._sampler_java_id:
+            return False
+        if self.runnable_only and (str(info.getThreadState()) != "RUNNABLE"):
+            return False
+        name = str(info.getThreadName())
+        if (self.include_threads is not None) and (self.include_threads.search(name) is None):
+            return False
+        if (self.exclude_threads is not None) and (self.exclude_threads.search(name) is not None):
+            return False
+        return True
+
+    def _python_frames(self) -> List[str]:
+        """
+        Returns the current Python stack of the calling thread, outermost frame first.
+
+        :return: the frames
+        :rtype: list
+        """
+        result = []
+        frame = sys._current_frames().get(self._caller_ident)
+        while frame is not None:
+            code = frame.f_code
+            result.append("%s:%s" % (os.path.basename(code.co_filename), code.co_name))
+            frame = frame.f_back
+        result.reverse()
+        return result
+
+    def _add(self, stack: str):
+        """
+        Adds the collapsed stack to the statistics.
+
+        :param stack: the collapsed stack
+        :type stack: str
+        """
+        with self._lock:
+            if (stack not in self._stacks) and (len(self._stacks) >= self.max_stacks):
+                stack = OTHER_STACK
+            self._stacks[stack] = self._stacks.get(stack, 0) + 1
+
+    def sample(self):
+        """
+        Takes a single sample of all the (accepted) Java threads.
+        """
+        py_frames = self._python_frames()
+        infos = self._mxbean.getThreadInfo(self._mxbean.getAllThreadIds(), self.max_depth)
+        for info in infos:
+            if (info is None) or not self._accept_thread(info):
+                continue
+            frames = list(py_frames)
+            frames.append("[%s]" % str(info.getThreadName()))
+            java_frames = ["%s.%s" % (str(e.getClassName()), str(e.getMethodName())) for e in info.getStackTrace()]
+            java_frames.reverse()
+            frames.extend(java_frames)
+            self._add(";".join(x.replace(";", ":") for x in frames))
+        self._num_samples += 1
+
+    def _run(self):
+        """
+        The sampling loop, executed in a separate thread.
+        """
+        self._sampler_java_id = JClass("java.lang.Thread").currentThread().getId()
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                _logger.exception("Failed to sample threads!")
+
+    def start(self):
+        """
+        Starts the sampling. Must be called from the thread that executes the flow.
+        """
+        if self._thread is not None:
+            raise Exception("Profiler already running!")
+        self._mxbean = JClass("java.lang.management.ManagementFactory").getThreadMXBean()
+        self._caller_ident = threading.get_ident()
+        self._caller_java_id = JClass("java.lang.Thread").currentThread().getId()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="pyadams-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the sampling.
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        _logger.debug("Collected %d samples with %d distinct stacks" % (self._num_samples, len(self._stacks)))
+
+    def __enter__(self):
+        """
+        Starts the sampling.
+
+        :return: itself
+        :rtype: SamplingProfiler
+        """
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Stops the sampling.
+        """
+        self.stop()
+
+    def reset(self):
+        """
+        Removes all collected samples.
+        """
+        with self._lock:
+            self._stacks = dict()
+            self._num_samples = 0
+
+    @property
+    def num_samples(self) -> int:
+        """
+        Returns the number of samples taken so far.
+
+        :return: the number of samples
+        :rtype: int
+        """
+        return self._num_samples
+
+    def stacks(self) -> Dict[str, int]:
+        """
+        Returns the collapsed stacks with their counts.
+
+        :return: the stacks
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(self._stacks)
+
+    def to_collapsed(self) -> str:
+        """
+        Returns the collapsed stacks in the format used by flamegraph.pl ("frame;frame;frame count").
+
+        :return: the collapsed stacks, one per line
+        :rtype: str
+        """
+        stacks = self.stacks()
+        return "".join("%s %d\n" % (k, stacks[k]) for k in sorted(stacks))
+
+    def write_collapsed(self, path: str):
+        """
+        Writes the collapsed stacks to the specified file.
+
+        :param path: the file to write to
+        :type path: str
+        """
+        with open(path, "w") as fp:
+            fp.write(self.to_collapsed())
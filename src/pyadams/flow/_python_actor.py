@@ -0,0 +1,346 @@
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from jpype import JClass, JProxy, JArray, JObject
+from ._core import Actor
+
+_logger = logging.getLogger(__name__)
+
+
+class PythonTransformer:
+    """
+    Ancestor for transformers implemented in Python. The processing happens in process(),
+    which receives a batch of inputs and has to return one output per input (in the same order).
+
+    With a batch size larger than 1, the tokens get collected on the Python side (the only
+    work per token) and each complete batch gets processed at once, its outputs get forwarded
+    as an array that gets turned back into a sequence of tokens (ArrayToSequence). ADAMS offers
+    no way for a transformer to emit tokens after its input has ended, therefore the final,
+    incomplete batch gets processed once the flow has finished and its outputs get handed to
+    finish() instead (default: kept in the remainder attribute).
+
+    Usage:
+
+        class Scale(PythonTransformer):
+            def process(self, items):
+                return list(np.asarray(items, dtype=float) * 2)
+
+        flow.jobject.add(Scale(batch_size=100).to_actor().jobject)
+    """
+
+    def __init__(self, name: str = None, batch_size: int = 1, num_workers: int = 0):
+        """
+        Initializes the transformer.
+
+        :param name: the name for the actor, uses the class name if None
+        :type name: str
+        :param batch_size: the number of tokens to process at a time
+        :type batch_size: int
+        :param num_workers: the number of threads to split a batch across, 0 to process in the calling thread
+        :type num_workers: int
+        """
+        if batch_size < 1:
+            raise Exception("Batch size must be at least 1: %d" % batch_size)
+        if num_workers < 0:
+            raise Exception("Number of workers cannot be negative: %d" % num_workers)
+        self.name = self.__class__.__name__ if (name is None) else name
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.processed = 0
+        self.remainder = []
+        self._pending = []
+        self._conversion = None
+        self._executor = None
+
+    def process(self, items: List) -> List:
+        """
+        Processes the batch of inputs and returns one output per input.
+
+        :param items: the inputs to process
+        :type items: list
+        :return: the generated outputs
+        :rtype: list
+        """
+        raise NotImplementedError()
+
+    def from_java(self, obj):
+        """
+        Converts the incoming Java object before it gets passed to process().
+        Default implementation returns the object as is.
+
+        :param obj: the Java object to convert
+        :return: the converted object
+        """
+        return obj
+
+    def to_java(self, obj):
+        """
+        Converts the output generated by process() before it gets forwarded in the flow.
+        Default implementation returns the object as is.
+
+        :param obj: the object to convert
+        :return: the converted object
+        """
+        return obj
+
+    def process_batch(self, items: List) -> List:
+        """
+        Processes the batch, splitting it across the worker threads if enabled.
+
+        :param items: the inputs to process
+        :type items: list
+        :return: the generated outputs, in the same order as the inputs
+        :rtype: list
+        """
+        self.processed += len(items)
+        items = [self.from_java(x) for x in items]
+        if (self.num_workers < 2) or (len(items) < 2):
+            result = self.process(items)
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix=self.name)
+            size = (len(items) + self.num_workers - 1) // self.num_workers
+            chunks = [items[i:i + size] for i in range(0, len(items), size)]
+            result = []
+            for outputs in self._executor.map(self.process, chunks):
+                result.extend(outputs)
+        if len(result) != len(items):
+            raise Exception("Expected %d outputs, but got %d!" % (len(items), len(result)))
+        return [self.to_java(x) for x in result]
+
+    def add(self, item) -> List:
+        """
+        Adds the incoming item to the current batch and processes the batch once complete.
+
+        :param item: the Java object to add
+        :return: the generated outputs, empty if the batch is not complete yet
+        :rtype: list
+        """
+        self._pending.append(item)
+        if len(self._pending) < self.batch_size:
+            return []
+        return self.flush()
+
+    def flush(self) -> List:
+        """
+        Processes the current (possibly incomplete) batch.
+
+        :return: the generated outputs, empty if no items pending
+        :rtype: list
+        """
+        if len(self._pending) == 0:
+            return []
+        items = self._pending
+        self._pending = []
+        return self.process_batch(items)
+
+    def finish(self, outputs: List):
+        """
+        Receives the outputs of the final, incomplete batch, which got processed after the flow finished
+        and therefore can no longer be forwarded in the flow. Default implementation adds them to the
+        remainder attribute.
+
+        :param outputs: the outputs of the final batch
+        :type outputs: list
+        """
+        _logger.info("%s: %d output(s) of the final incomplete batch (batch size %d) available via remainder"
+                     % (self.name, len(outputs), self.batch_size))
+        self.remainder.extend(outputs)
+
+    def _finish_batch(self):
+        """
+        Processes the final, incomplete batch, if any, and hands the outputs to finish().
+        """
+        if len(self._pending) > 0:
+            self.finish(self.flush())
+
+    def clean_up(self):
+        """
+        Processes any pending items and shuts down the worker threads.
+        """
+        self._finish_batch()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def to_actor(self) -> Actor:
+        """
+        Generates the actor that embeds this transformer in a flow.
+
+        :return: the actor, a Convert transformer or, with a batch size larger than 1, a SubProcess
+        :rtype: Actor
+        """
+        self._conversion = _Conversion(self)
+        convert = JClass("adams.flow.transformer.Convert")()
+        convert.setName(self.name)
+        convert.setConversion(self._conversion.proxy)
+        if self.batch_size == 1:
+            return Actor(convert)
+
+        result = JClass("adams.flow.control.SubProcess")()
+        result.setName(self.name)
+        result.add(convert)
+        result.add(JClass("adams.flow.transformer.ArrayToSequence")())
+        return Actor(result)
+
+
+class _Conversion:
+    """
+    Implements the adams.data.conversion.Conversion interface and forwards the data to the PythonTransformer.
+    """
+
+    def __init__(self, transformer: PythonTransformer):
+        """
+        Initializes the conversion.
+
+        :param transformer: the transformer to forward the data to
+        :type transformer: PythonTransformer
+        """
+        self.transformer = transformer
+        self.input = None
+        self.output = None
+        self.owner = None
+        self.quick_info = None
+        self.proxy = JProxy("adams.data.conversion.Conversion", inst=self)
+
+    def accepts(self):
+        """
+        Returns the class that is accepted as input.
+
+        :return: the class, Unknown (any type)
+        """
+        return JClass("adams.flow.core.Unknown").class_
+
+    def generates(self):
+        """
+        Returns the class that is generated as output.
+
+        :return: the class, Object[] for batches, otherwise Unknown (any type)
+        """
+        if self.transformer.batch_size == 1:
+            return JClass("adams.flow.core.Unknown").class_
+        else:
+            return JArray(JObject).class_
+
+    def setInput(self, value):
+        """
+        Sets the input to convert.
+
+        :param value: the Java object
+        """
+        self.input = value
+
+    def getInput(self):
+        """
+        Returns the input to convert.
+
+        :return: the Java object
+        """
+        return self.input
+
+    def convert(self):
+        """
+        Processes the input.
+
+        :return: None if successful, otherwise the error message
+        """
+        self.output = None
+        try:
+            if self.transformer.batch_size == 1:
+                self.output = self.transformer.process_batch([self.input])[0]
+            else:
+                # empty while the batch is incomplete, ArrayToSequence then emits nothing
+                self.output = JArray(JObject)(self.transformer.add(self.input))
+            return None
+        except Exception:
+            return "%s failed to process input:\n%s" % (self.transformer.name, traceback.format_exc())
+
+    def getOutput(self):
+        """
+        Returns the processed output.
+
+        :return: the Java object
+        """
+        return self.output
+
+    def setOwner(self, value):
+        """
+        Sets the owning actor.
+
+        :param value: the Java actor object
+        """
+        self.owner = value
+
+    def getOwner(self):
+        """
+        Returns the owning actor.
+
+        :return: the Java actor object
+        """
+        return self.owner
+
+    def setQuickInfo(self, value):
+        """
+        Sets the quick info.
+
+        :param value: the info
+        """
+        self.quick_info = value
+
+    def getQuickInfo(self):
+        """
+        Returns the quick info.
+
+        :return: the info
+        """
+        return self.quick_info
+
+    def globalInfo(self):
+        """
+        Returns a description of the conversion.
+
+        :return: the description
+        """
+        return "Forwards the data to the Python transformer: %s" % self.transformer.name
+
+    def toCommandLine(self):
+        """
+        Returns the command-line, uses the pass-through conversion as the proxy cannot be instantiated from a command-line.
+
+        :return: the command-line
+        """
+        return "adams.data.conversion.PassThrough"
+
+    def shallowCopy(self, *args):
+        """
+        Returns itself, as the Python state cannot be copied on the Java side.
+
+        :return: the proxy
+        """
+        return self.proxy
+
+    def cleanUp(self):
+        """
+        Cleans up the data structures, processes the final incomplete batch once the flow has finished.
+        """
+        self.input = None
+        self.output = None
+        # also gets called after each conversion, while running further items of the batch may still arrive
+        root = None if (self.owner is None) else self.owner.getRoot()
+        if (root is not None) and (root.isExecuted() or root.isStopped()):
+            self.transformer._finish_batch()
+
+    def cleanUpOptions(self):
+        """
+        Cleans up the options.
+        """
+        pass
+
+    def destroy(self):
+        """
+        Frees up resources.
+        """
+        self.cleanUp()
+        self.transformer.clean_up()
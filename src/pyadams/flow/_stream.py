@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import queue
+import threading
+from typing import Callable, List, Optional
+
+from jpype import JClass
+from ._core import Actor
+from ._python_actor import PythonTransformer
+
+_logger = logging.getLogger(__name__)
+
+_END = object()
+""" marks the end of the stream. """
+
+
+class _Tap(PythonTransformer):
+    """
+    Pass-through transformer that hands the tokens to the stream.
+    """
+
+    def __init__(self, stream: 'TokenStream'):
+        """
+        Initializes the tap.
+
+        :param stream: the stream to hand the tokens to
+        :type stream: TokenStream
+        """
+        super().__init__(name="pyadams-stream-%d" % id(stream))
+        self.stream = stream
+
+    def process(self, items: List) -> List:
+        """
+        Hands the items to the stream and forwards them unchanged.
+
+        :param items: the payloads of the incoming tokens
+        :type items: list
+        :return: the unchanged items
+        :rtype: list
+        """
+        for item in items:
+            self.stream.add(item)
+        return items
+
+
+class TokenStream:
+    """
+    Exposes the tokens arriving at an actor in the flow as Python iterator (or async iterator).
+    A pass-through transformer gets inserted in front of the actor for the duration of the
+    stream, i.e., only the tokens for that actor cross into Python (no flow execution listener
+    that gets notified about every event of every actor). The tokens are collected in batches
+    and placed in a bounded queue. If the consumer cannot keep up, the flow blocks once the queue
+    is full (backpressure). The tokens only get converted when the consumer retrieves them.
+    Leaving the iteration early (or cancelling the async iteration) stops the flow.
+
+    Usage:
+
+        with TokenStream(flow, "Flow.Display") as stream:
+            for item in stream:
+                ...
+    """
+
+    def __init__(self, flow: Actor, actor_name: str, queue_size: int = 10, batch_size: int = 100,
+                 converter: Optional[Callable] = None, set_up: bool = True):
+        """
+        Initializes the stream.
+
+        :param flow: the flow to execute
+        :type flow: Actor
+        :param actor_name: the full name of the actor to intercept the incoming tokens of (e.g., 'Flow.Display') or just its name
+        :type actor_name: str
+        :param queue_size: the maximum number of batches to queue up before the flow gets blocked
+        :type queue_size: int
+        :param batch_size: the number of tokens to transfer at a time
+        :type batch_size: int
+        :param converter: the function for converting the Java payloads of the tokens, returns them as is if None
+        :type converter: callable
+        :param set_up: whether to call set_up() on the flow before executing it
+        :type set_up: bool
+        """
+        if queue_size < 1:
+            raise Exception("Queue size must be at least 1: %d" % queue_size)
+        if batch_size < 1:
+            raise Exception("Batch size must be at least 1: %d" % batch_size)
+        self.flow = flow
+        self.actor_name = actor_name
+        self.batch_size = batch_size
+        self.converter = (lambda x: x) if (converter is None) else converter
+        self.set_up = set_up
+        self.error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._batch = []
+        self._batch_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+        self._tap = None
+        self._tap_parent = None
+
+    def _find_actor(self):
+        """
+        Locates the actor of interest in the flow.
+
+        :return: the Java actor object
+        """
+        ActorHandler = JClass("adams.flow.core.ActorHandler")
+        todo = [self.flow.jobject]
+        while len(todo) > 0:
+            actor = todo.pop()
+            if (actor.getFullName() == self.actor_name) or (actor.getName() == self.actor_name):
+                return actor
+            if isinstance(actor, ActorHandler):
+                todo.extend(actor.get(i) for i in range(actor.size()))
+        raise Exception("Actor not found in flow: %s" % self.actor_name)
+
+    def _insert_tap(self):
+        """
+        Inserts the pass-through transformer in front of the actor of interest.
+        """
+        actor = self._find_actor()
+        parent = actor.getParent()
+        if (parent is None) or not isinstance(parent, JClass("adams.flow.core.MutableActorHandler")) \
+                or (str(parent.getActorHandlerInfo().getActorExecution()) != "SEQUENTIAL"):
+            raise Exception("Actor must be part of a sequence of actors: %s" % self.actor_name)
+        self._tap = _Tap(self)
+        tap = self._tap.to_actor().jobject
+        parent.add(parent.indexOf(actor.getName()), tap)
+        self._tap_parent = parent
+        if not self.set_up:
+            msg = tap.setUp()
+            if msg is not None:
+                self._remove_tap()
+                raise Exception("Failed to set up stream for %s: %s" % (self.actor_name, msg))
+
+    def _remove_tap(self):
+        """
+        Removes the pass-through transformer again.
+        """
+        if self._tap_parent is None:
+            return
+        index = self._tap_parent.indexOf(self._tap.name)
+        if index > -1:
+            self._tap_parent.remove(index)
+        self._tap.clean_up()
+        self._tap = None
+        self._tap_parent = None
+
+    def add(self, item):
+        """
+        Collects the payload of a token that arrived at the actor of interest.
+
+        :param item: the Java payload
+        """
+        if self._closed.is_set():
+            return
+        full = None
+        with self._batch_lock:
+            self._batch.append(item)
+            if len(self._batch) >= self.batch_size:
+                full = self._batch
+                self._batch = []
+        # outside the lock, as it blocks while the queue is full
+        if full is not None:
+            self._put(full)
+
+    def _put(self, item):
+        """
+        Places the item in the queue, blocks while the queue is full and the stream is open.
+
+        :param item: the item to add
+        """
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _execute(self):
+        """
+        Executes the flow, gets run in a separate thread.
+        """
+        try:
+            if self.set_up:
+                self.error = self.flow.set_up()
+            if self.error is None:
+                self.error = self.flow.execute()
+        except Exception as e:
+            _logger.exception("Failed to execute flow!")
+            self.error = str(e)
+        finally:
+            with self._batch_lock:
+                rest = self._batch
+                self._batch = []
+            if len(rest) > 0:
+                self._put(rest)
+            self._put(_END)
+
+    def _get(self):
+        """
+        Retrieves the next item from the queue, returns the end marker once the stream got closed.
+
+        :return: the item
+        """
+        while not self._closed.is_set():
+            try:
+                return self._queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _END
+
+    def start(self):
+        """
+        Starts the flow execution in a separate thread.
+        """
+        if self._thread is not None:
+            raise Exception("Stream already started!")
+        self._closed.clear()
+        self._insert_tap()
+        self._thread = threading.Thread(target=self._execute, name="pyadams-stream", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """
+        Stops the flow (if still running), waits for the execution to finish and removes the
+        pass-through transformer again.
+        """
+        if self._thread is None:
+            return
+        self._closed.set()
+        if self._thread.is_alive():
+            self.flow.stop_execution()
+        self._thread.join()
+        self._thread = None
+        self._remove_tap()
+
+    def __enter__(self):
+        """
+        Starts the flow execution.
+
+        :return: itself
+        :rtype: TokenStream
+        """
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Stops the flow execution if necessary.
+        """
+        self.close()
+
+    def _check_error(self):
+        """
+        Raises an exception if the flow execution failed.
+        """
+        if self.error is not None:
+            raise Exception("Flow execution failed: %s" % self.error)
+
+    def __iter__(self):
+        """
+        Iterates over the (converted) tokens, starts the flow if necessary.
+        """
+        if self._thread is None:
+            self.start()
+        try:
+            while True:
+                batch = self._get()
+                if batch is _END:
+                    break
+                for item in batch:
+                    yield self.converter(item)
+            self._check_error()
+        finally:
+            # also when the consumer stops early, otherwise the flow thread keeps waiting for the queue
+            self.close()
+
+    async def __aiter__(self):
+        """
+        Asynchronously iterates over the (converted) tokens, starts the flow if necessary.
+        """
+        if self._thread is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                # _get returns once closed, i.e., the executor thread does not stay blocked on cancellation
+                batch = await loop.run_in_executor(None, self._get)
+                if batch is _END:
+                    break
+                for item in batch:
+                    yield self.converter(item)
+            self._check_error()
+        finally:
+            self.close()
@@ -1,15 +1,26 @@
 import argparse
+import hashlib
 import json
 import logging
 import os
+import re
 import requests
+import threading
+import shutil
+import time
 import traceback
+import urllib.parse
+import urllib.request
 import zipfile
-from typing import Dict, Optional
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 from wai.logging import init_logging, set_logging_level, add_logging_level
 from pyadams.core.jvm import ENV_PYADAMS_LOGLEVEL
+from pyadams.core.platform import native_lib_dir
 from pyadams.core.project import init_project_dir, project_dir
+from pyadams.tool.store import LINK_TYPES, extract_to_store, collect_garbage
 
 DOWNLOAD = "pa-download"
 
@@ -18,14 +29,57 @@ _logger = logging.getLogger(DOWNLOAD)
 ACTION_UPDATE = "update"
 ACTION_LIST = "list"
 ACTION_DOWNLOAD = "download"
+ACTION_SYNC = "sync"
+ACTION_GC = "gc"
 ACTIONS = [
     ACTION_UPDATE,
     ACTION_LIST,
     ACTION_DOWNLOAD,
+    ACTION_SYNC,
+    ACTION_GC,
 ]
 
 DOWNLOADS_URL = "https://raw.githubusercontent.com/waikato-datamining/pyadams/main/downloads.json"
 
+DEFAULT_TTL = 24 * 60 * 60
+""" the default time in seconds after which to check for updated downloads information. """
+
+DEFAULT_CONNECTIONS = 4
+""" the default number of parallel connections per download. """
+
+MIN_CHUNK_SIZE = 64 * 1024
+""" the smallest chunk size to read from a connection. """
+
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+""" the largest chunk size to read from a connection. """
+
+MIN_SEGMENT_SIZE = 8 * 1024 * 1024
+""" the minimum size of a segment when splitting a download across connections. """
+
+STATE_EXT = ".pa-download"
+""" the extension of the file that stores the progress of a partial download. """
+
+DEFAULT_PARALLEL = 2
+""" the default number of artifacts to download concurrently when syncing. """
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+""" the default number of threads to use for extracting archives. """
+
+
+def lib_patterns() -> List[str]:
+    """
+    Returns the glob patterns for the archive members that are required for running ADAMS
+    via pyadams.core.jvm, i.e., the jars in the lib directory and the platform-specific libraries.
+
+    :return: the patterns
+    :rtype: list
+    """
+    result = ["lib/*.jar", "*/lib/*.jar"]
+    sub_dir = native_lib_dir()
+    if sub_dir is not None:
+        result.extend(["lib/%s/*" % sub_dir, "*/lib/%s/*" % sub_dir])
+    return result
+
 
 def _downloads_info_file() -> str:
     """
@@ -37,46 +91,157 @@ def _downloads_info_file() -> str:
     return os.path.join(project_dir(), "downloads.json")
 
 
-def update_downloads_info():
+def _downloads_meta_file() -> str:
+    """
+    Returns the filename for the meta-data of the local downloads information (ETag, Last-Modified, etc).
+
+    :return: the filename
+    :rtype: str
+    """
+    return os.path.join(project_dir(), "downloads.meta.json")
+
+
+def _local_index(index: str) -> Optional[str]:
     """
-    Updates the download information.
+    Returns the local file that the index refers to.
+
+    :param index: the URL or path of the downloads information
+    :type index: str
+    :return: the local file, None if the index is a remote URL
+    :rtype: str
     """
+    if index.startswith("file://"):
+        return urllib.request.url2pathname(urllib.parse.urlparse(index).path)
+    if index.startswith("http://") or index.startswith("https://"):
+        return None
+    return index
+
+
+def _mirror_index(mirror: str) -> str:
+    """
+    Returns the downloads information file of the mirror directory.
+
+    :param mirror: the mirror directory
+    :type mirror: str
+    :return: the file
+    :rtype: str
+    """
+    return os.path.join(mirror, "downloads.json")
+
+
+def update_downloads_info(index: str = DOWNLOADS_URL, ttl: float = 0):
+    """
+    Updates the download information, using a conditional request (ETag/Last-Modified).
+
+    :param index: the URL of the downloads information
+    :type index: str
+    :param ttl: the time in seconds for which the local information is considered fresh and no request is made
+    :type ttl: float
+    """
+    if _local_index(index) is not None:
+        _logger.info("Using local downloads information, nothing to update: %s" % index)
+        return
     init_project_dir()
-    _logger.info("Retrieving: %s" % DOWNLOADS_URL)
-    r = requests.get(DOWNLOADS_URL)
-    if r.status_code == 200:
+    meta = dict()
+    if os.path.exists(_downloads_info_file()) and os.path.exists(_downloads_meta_file()):
+        with open(_downloads_meta_file(), "r") as fp:
+            meta = json.load(fp)
+        if meta.get("url", None) != index:
+            meta = dict()
+    if (len(meta) > 0) and (ttl > 0) and (time.time() - meta.get("fetched", 0) < ttl):
+        _logger.info("Downloads information still fresh, skipping update")
+        return
+
+    headers = dict()
+    if meta.get("etag", None) is not None:
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified", None) is not None:
+        headers["If-Modified-Since"] = meta["last_modified"]
+    _logger.info("Retrieving: %s" % index)
+    cached = os.path.exists(_downloads_info_file())
+    try:
+        r = requests.get(index, headers=headers)
+    except requests.RequestException as e:
+        if cached:
+            _logger.warning("Failed to retrieve downloads information, using cached copy: %s" % str(e))
+        else:
+            _logger.error("Failed to retrieve downloads information: %s" % str(e))
+        return
+    if r.status_code == 304:
+        _logger.info("Downloads information not modified")
+    elif r.status_code == 200:
         _logger.info("Writing downloads info to: %s" % _downloads_info_file())
         with open(_downloads_info_file(), "w") as fp:
             fp.write(r.text)
+        meta = {
+            "url": index,
+            "etag": r.headers.get("ETag", None),
+            "last_modified": r.headers.get("Last-Modified", None),
+        }
+    elif cached:
+        _logger.warning("Failed to retrieve downloads information (code=%d), using cached copy" % r.status_code)
+        return
     else:
         _logger.error("Failed to download: code=%d" % r.status_code)
+        return
+    meta["fetched"] = time.time()
+    with open(_downloads_meta_file(), "w") as fp:
+        json.dump(meta, fp, indent=2)
+
 
+_downloads_cache = dict()
+""" the parsed downloads information, per file (tuple of modification time and data). """
 
-def _load_downloads() -> Optional[Dict]:
+
+def _load_downloads(index: str = DOWNLOADS_URL, ttl: float = DEFAULT_TTL, mirror: str = None) -> Optional[Dict]:
     """
-    Loads the downloads info file and returns the dictionary. Updates it if missing.
+    Loads the downloads info file and returns the dictionary. Updates it if missing or older than the TTL.
+    The parsed information is cached until the file changes.
 
+    :param index: the URL or local path (or file:// URL) of the downloads information
+    :type index: str
+    :param ttl: the time in seconds after which to check for updated information, negative for never
+    :type ttl: float
+    :param mirror: the local mirror directory to use instead of the index (offline mode)
+    :type mirror: str
     :return: the download info, None if failed to load
     :rtype: dict
     """
-    init_project_dir()
-    if not os.path.exists(_downloads_info_file()):
-        _logger.warning("No downloads information available, attempting update...")
-        update_downloads_info()
-    if not os.path.exists(_downloads_info_file()):
-        _logger.error("No downloads information available (%s), cannot load information!" % _downloads_info_file())
+    if mirror is not None:
+        index = _mirror_index(mirror)
+    path = _local_index(index)
+    if path is None:
+        path = _downloads_info_file()
+        init_project_dir()
+        if not os.path.exists(path):
+            _logger.warning("No downloads information available, attempting update...")
+            update_downloads_info(index=index)
+        elif ttl >= 0:
+            update_downloads_info(index=index, ttl=ttl)
+    if not os.path.exists(path):
+        _logger.error("No downloads information available (%s), cannot load information!" % path)
         return None
-    with open(_downloads_info_file(), "r") as fp:
-        return json.load(fp)
+    mtime = os.path.getmtime(path)
+    if (path not in _downloads_cache) or (_downloads_cache[path][0] != mtime):
+        with open(path, "r") as fp:
+            _downloads_cache[path] = (mtime, json.load(fp))
+    return _downloads_cache[path][1]
 
 
-def list_downloads():
+def list_downloads(index: str = DOWNLOADS_URL, ttl: float = DEFAULT_TTL, mirror: str = None):
     """
     Lists all available downloads.
+
+    :param index: the URL or local path (or file:// URL) of the downloads information
+    :type index: str
+    :param ttl: the time in seconds after which to check for updated information, negative for never
+    :type ttl: float
+    :param mirror: the local mirror directory to use instead of the index (offline mode)
+    :type mirror: str
     """
-    info = _load_downloads()
+    info = _load_downloads(index=index, ttl=ttl, mirror=mirror)
     if info is None:
-        _logger.error("No downloads information available (%s), cannot list information!" % _downloads_info_file())
+        _logger.error("No downloads information available, cannot list information!")
         return
     print("version/name")
     for version in info:
@@ -84,7 +249,522 @@ def list_downloads():
             print("%s/%s" % (version, name))
 
 
-def download(version: str, name: str, output_dir: str, extract: bool):
+def _url_filename(url: str) -> str:
+    """
+    Determines the filename from the URL, skipping the trailing 'download' of sourceforge URLs.
+
+    :param url: the URL to get the filename from
+    :type url: str
+    :return: the filename
+    :rtype: str
+    """
+    parts = [x for x in urllib.parse.urlparse(url).path.split("/") if len(x) > 0]
+    if (len(parts) > 1) and (parts[-1] == "download"):
+        return parts[-2]
+    return parts[-1]
+
+
+def _mirror_file(mirror: str, version: str, url: str) -> str:
+    """
+    Returns the path of the archive in the mirror directory.
+
+    :param mirror: the mirror directory
+    :type mirror: str
+    :param version: the version of the archive
+    :type version: str
+    :param url: the URL of the archive
+    :type url: str
+    :return: the path
+    :rtype: str
+    """
+    return os.path.join(mirror, version, _url_filename(url))
+
+
+def _download_entry(entry) -> Tuple[str, Optional[str]]:
+    """
+    Returns URL and checksum from a downloads info entry, which is either just the URL
+    or a dictionary with the keys 'url' and (optional) 'sha256'.
+
+    :param entry: the entry to parse
+    :type entry: str or dict
+    :return: the tuple of URL and SHA-256 checksum (None if not available)
+    :rtype: tuple
+    """
+    if isinstance(entry, str):
+        return entry, None
+    return entry["url"], entry.get("sha256", None)
+
+
+def _new_session(connections: int) -> requests.Session:
+    """
+    Creates a session with a connection pool large enough for the specified number of connections.
+
+    :param connections: the number of parallel connections
+    :type connections: int
+    :return: the session
+    :rtype: requests.Session
+    """
+    result = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=connections, pool_maxsize=connections)
+    result.mount("http://", adapter)
+    result.mount("https://", adapter)
+    return result
+
+
+def _probe(session: requests.Session, url: str) -> Tuple[str, Optional[int], bool]:
+    """
+    Determines the final URL (after redirects), the size and whether range requests are supported.
+
+    :param session: the session to use
+    :type session: requests.Session
+    :param url: the URL to probe
+    :type url: str
+    :return: the tuple of URL, size (None if unknown) and range support
+    :rtype: tuple
+    """
+    with session.get(url, headers={"Range": "bytes=0-0"}, stream=True, allow_redirects=True) as r:
+        r.raise_for_status()
+        if (r.status_code == 206) and ("/" in r.headers.get("Content-Range", "")):
+            size = r.headers["Content-Range"].split("/")[-1]
+            return r.url, (int(size) if size.isdigit() else None), True
+        size = r.headers.get("Content-Length", None)
+        return r.url, (int(size) if (size is not None) and size.isdigit() else None), False
+
+
+def _sha256(path: str) -> str:
+    """
+    Computes the SHA-256 checksum of the file.
+
+    :param path: the file to compute the checksum for
+    :type path: str
+    :return: the hex digest
+    :rtype: str
+    """
+    result = hashlib.sha256()
+    with open(path, "rb") as fp:
+        while True:
+            data = fp.read(MAX_CHUNK_SIZE)
+            if len(data) == 0:
+                break
+            result.update(data)
+    return result.hexdigest()
+
+
+def _load_state(state_file: str, url: str, size: Optional[int]) -> Optional[Dict]:
+    """
+    Loads the state of a partial download, if available and still applicable.
+
+    :param state_file: the file with the state
+    :type state_file: str
+    :param url: the URL that is being downloaded (as requested, ie before any redirects)
+    :type url: str
+    :param size: the size of the download
+    :type size: int
+    :return: the state, None if not available or not applicable
+    :rtype: dict
+    """
+    if not os.path.exists(state_file):
+        return None
+    try:
+        with open(state_file, "r") as fp:
+            state = json.load(fp)
+        if (state.get("url", None) == url) and (state.get("size", None) == size):
+            return state
+    except Exception:
+        _logger.warning("Failed to read download state: %s" % state_file)
+    return None
+
+
+def _save_state(state_file: str, state: Dict):
+    """
+    Saves the state of the partial download.
+
+    :param state_file: the file to save the state to
+    :type state_file: str
+    :param state: the state to save
+    :type state: dict
+    """
+    tmp_file = state_file + ".tmp"
+    with open(tmp_file, "w") as fp:
+        json.dump(state, fp)
+    os.replace(tmp_file, state_file)
+
+
+def _fetch_segment(session: requests.Session, url: str, local_filename: str, segment: List[int],
+                   ranged: bool, on_progress):
+    """
+    Downloads the segment of the file, adapting the chunk size to the throughput.
+
+    :param session: the session to use
+    :type session: requests.Session
+    :param url: the URL to download
+    :type url: str
+    :param local_filename: the file to write to (must exist)
+    :type local_filename: str
+    :param segment: the segment to download (start, end (excl), current position), gets updated
+    :type segment: list
+    :param ranged: whether to use a range request
+    :type ranged: bool
+    :param on_progress: the function to call with the number of bytes after writing a chunk
+    """
+    start, end, pos = segment
+    if (end is not None) and (pos >= end):
+        return
+    headers = dict()
+    if ranged:
+        headers["Range"] = "bytes=%d-%s" % (pos, "" if (end is None) else str(end - 1))
+    chunk_size = MIN_CHUNK_SIZE
+    with session.get(url, headers=headers, stream=True) as r:
+        r.raise_for_status()
+        if ranged and (r.status_code != 206):
+            raise Exception("Server ignored range request for: %s" % url)
+        with open(local_filename, "r+b") as fp:
+            fp.seek(pos)
+            while (end is None) or (pos < end):
+                read_start = time.time()
+                data = r.raw.read(chunk_size, decode_content=True)
+                if len(data) == 0:
+                    break
+                fp.write(data)
+                pos += len(data)
+                segment[2] = pos
+                on_progress(len(data))
+                duration = time.time() - read_start
+                if (duration < 0.25) and (chunk_size < MAX_CHUNK_SIZE):
+                    chunk_size *= 2
+                elif (duration > 1.0) and (chunk_size > MIN_CHUNK_SIZE):
+                    chunk_size //= 2
+    if (end is not None) and (pos < end):
+        raise Exception("Connection closed prematurely at byte %d of segment %d-%d: %s" % (pos, start, end, url))
+
+
+class RateLimiter:
+    """
+    Token bucket for limiting the combined bandwidth of all the connections that share it.
+    """
+
+    def __init__(self, max_rate: float):
+        """
+        Initializes the limiter.
+
+        :param max_rate: the maximum number of bytes per second
+        :type max_rate: float
+        """
+        if max_rate <= 0:
+            raise Exception("Maximum rate must be greater than 0: %s" % str(max_rate))
+        self.max_rate = max_rate
+        self._available = max_rate
+        self._last = time.time()
+        self._lock = threading.Lock()
+
+    def consume(self, num_bytes: int):
+        """
+        Accounts for the transferred bytes, blocks if the maximum rate has been exceeded.
+
+        :param num_bytes: the number of bytes that were transferred
+        :type num_bytes: int
+        """
+        with self._lock:
+            now = time.time()
+            self._available = min(self.max_rate, self._available + (now - self._last) * self.max_rate)
+            self._last = now
+            self._available -= num_bytes
+            wait = -self._available / self.max_rate if (self._available < 0) else 0
+        if wait > 0:
+            time.sleep(wait)
+
+
+def download_file(url: str, local_filename: str, connections: int = DEFAULT_CONNECTIONS, checksum: str = None,
+                  session: requests.Session = None, limiter: RateLimiter = None, skip_up_to_date: bool = False) -> int:
+    """
+    Downloads the URL to the local file. If the server supports range requests, the file gets
+    split into segments that are downloaded in parallel. The progress gets recorded alongside
+    the file, allowing interrupted downloads to be resumed.
+
+    :param url: the URL to download
+    :type url: str
+    :param local_filename: the file to save the download as
+    :type local_filename: str
+    :param connections: the maximum number of parallel connections to use
+    :type connections: int
+    :param checksum: the SHA-256 checksum to verify the download against, ignored if None
+    :type checksum: str
+    :param session: the session to use, creates a new one if None
+    :type session: requests.Session
+    :param limiter: for limiting the bandwidth, ignored if None
+    :type limiter: RateLimiter
+    :param skip_up_to_date: whether to skip the download if the local file matches the checksum or, without checksum, the size
+    :type skip_up_to_date: bool
+    :return: the number of bytes that were transferred
+    :rtype: int
+    """
+    if connections < 1:
+        raise Exception("Number of connections must be at least 1: %d" % connections)
+    if session is None:
+        session = _new_session(connections)
+    _logger.info("Downloading: %s" % url)
+    _logger.info("Local file: %s" % local_filename)
+    final_url, size, ranged = _probe(session, url)
+    ranged = ranged and (size is not None)
+    state_file = local_filename + STATE_EXT
+    if skip_up_to_date and os.path.exists(local_filename) and not os.path.exists(state_file):
+        if checksum is not None:
+            up_to_date = _sha256(local_filename).lower() == checksum.lower()
+        else:
+            up_to_date = (size is not None) and (os.path.getsize(local_filename) == size)
+        if up_to_date:
+            _logger.info("Already up-to-date: %s" % local_filename)
+            return 0
+    # keyed on the original URL, as mirrors redirect to a different URL on each request
+    state = _load_state(state_file, url, size) if ranged else None
+    if (state is not None) and os.path.exists(local_filename):
+        done = sum(x[2] - x[0] for x in state["segments"])
+        _logger.info("Resuming download, %d of %d bytes already available" % (done, size))
+    else:
+        if ranged:
+            num = max(1, min(connections, size // MIN_SEGMENT_SIZE))
+            seg_size = (size + num - 1) // num
+            segments = [[i, min(i + seg_size, size), i] for i in range(0, size, seg_size)]
+        else:
+            segments = [[0, None, 0]]
+        state = {"url": url, "size": size, "segments": segments}
+        with open(local_filename, "wb") as fp:
+            if size is not None:
+                fp.truncate(size)
+
+    lock = threading.Lock()
+    last_saved = [time.time()]
+    transferred = [0]
+
+    def on_progress(num_bytes: int):
+        """
+        Applies the bandwidth limit and saves the state of the download at most once per second.
+
+        :param num_bytes: the number of bytes that were written
+        :type num_bytes: int
+        """
+        if limiter is not None:
+            limiter.consume(num_bytes)
+        with lock:
+            transferred[0] += num_bytes
+            if not ranged:
+                return
+            if time.time() - last_saved[0] >= 1.0:
+                _save_state(state_file, state)
+                last_saved[0] = time.time()
+
+    _logger.info("Using %d connection(s)" % len(state["segments"]))
+    try:
+        with ThreadPoolExecutor(max_workers=len(state["segments"])) as executor:
+            futures = [executor.submit(_fetch_segment, session, final_url, local_filename, segment, ranged, on_progress)
+                       for segment in state["segments"]]
+            for future in futures:
+                future.result()
+    finally:
+        if ranged:
+            with lock:
+                _save_state(state_file, state)
+
+    if checksum is not None:
+        _logger.info("Verifying checksum")
+        actual = _sha256(local_filename)
+        if actual.lower() != checksum.lower():
+            os.remove(local_filename)
+            if os.path.exists(state_file):
+                os.remove(state_file)
+            raise Exception("Checksum mismatch for %s: expected=%s, actual=%s" % (local_filename, checksum, actual))
+    if os.path.exists(state_file):
+        os.remove(state_file)
+    return transferred[0]
+
+
+def _member_path(output_dir: str, name: str) -> str:
+    """
+    Returns the path that the archive member gets extracted to (like ZipFile.extract, ignoring any path traversal).
+
+    :param output_dir: the directory to extract to
+    :type output_dir: str
+    :param name: the name of the archive member
+    :type name: str
+    :return: the path
+    :rtype: str
+    """
+    parts = [x for x in name.replace("\\", "/").split("/") if x not in ("", ".", "..")]
+    return os.path.join(output_dir, *parts)
+
+
+def _crc32(path: str) -> int:
+    """
+    Computes the CRC32 checksum of the file.
+
+    :param path: the file to compute the checksum for
+    :type path: str
+    :return: the checksum
+    :rtype: int
+    """
+    result = 0
+    with open(path, "rb") as fp:
+        while True:
+            data = fp.read(MAX_CHUNK_SIZE)
+            if len(data) == 0:
+                break
+            result = zlib.crc32(data, result)
+    return result
+
+
+def _is_extracted(info: zipfile.ZipInfo, path: str) -> bool:
+    """
+    Checks whether the archive member has already been extracted, i.e., whether size and CRC match.
+
+    :param info: the archive member
+    :type info: zipfile.ZipInfo
+    :param path: the path of the extracted file
+    :type path: str
+    :return: True if already extracted
+    :rtype: bool
+    """
+    if not os.path.isfile(path) or (os.path.getsize(path) != info.file_size):
+        return False
+    return _crc32(path) == info.CRC
+
+
+_glob_regexps = dict()
+""" the compiled regular expressions per glob pattern. """
+
+
+def _glob_to_regexp(pattern: str):
+    """
+    Turns the glob pattern into a regular expression. Unlike fnmatch, "*" and "?" do not match
+    across directories ("/"), only "**" does.
+
+    :param pattern: the glob pattern to convert
+    :type pattern: str
+    :return: the compiled regular expression
+    """
+    result = _glob_regexps.get(pattern)
+    if result is None:
+        regexp = ""
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith("**", i):
+                regexp += ".*"
+                i += 2
+                continue
+            c = pattern[i]
+            if c == "*":
+                regexp += "[^/]*"
+            elif c == "?":
+                regexp += "[^/]"
+            elif c == "[":
+                end = pattern.find("]", i + 2)
+                if end == -1:
+                    regexp += re.escape(c)
+                else:
+                    chars = pattern[i + 1:end].replace("\\", "\\\\").replace("[", "\\[")
+                    if chars.startswith("!"):
+                        chars = "^" + chars[1:]
+                    regexp += "[" + chars + "]"
+                    i = end
+            else:
+                regexp += re.escape(c)
+            i += 1
+        result = re.compile("(?s:%s)\\Z" % regexp)
+        _glob_regexps[pattern] = result
+    return result
+
+
+def _matches(name: str, patterns: Optional[List[str]]) -> bool:
+    """
+    Checks whether the name matches any of the glob patterns ("*" and "?" do not match "/", "**" does).
+
+    :param name: the name to check
+    :type name: str
+    :param patterns: the patterns to match against
+    :type patterns: list
+    :return: True if at least one pattern matches
+    :rtype: bool
+    """
+    if patterns is None:
+        return False
+    for pattern in patterns:
+        if _glob_to_regexp(pattern).match(name) is not None:
+            return True
+    return False
+
+
+def extract_archive(archive: str, output_dir: str, workers: int = DEFAULT_WORKERS,
+                    include: List[str] = None, exclude: List[str] = None, link_type: str = None) -> Tuple[int, int]:
+    """
+    Extracts the archive in parallel, each worker thread using its own handle on the archive.
+    Members that have already been extracted (same size and CRC) are skipped.
+    When using a link type, the members get extracted into the content-addressed store
+    and the output directory merely contains links to the stored files.
+
+    :param archive: the zip file to extract
+    :type archive: str
+    :param output_dir: the directory to extract to
+    :type output_dir: str
+    :param workers: the number of threads to use
+    :type workers: int
+    :param include: the glob patterns of the members to extract, all if None or empty
+    :type include: list
+    :param exclude: the glob patterns of the members to skip, none if None
+    :type exclude: list
+    :param link_type: the type of links to create in the output directory (see pyadams.tool.store.LINK_TYPES), None to extract normally
+    :type link_type: str
+    :return: the number of extracted and skipped members (or newly stored and reused members when using the store)
+    :rtype: tuple
+    """
+    if workers < 1:
+        raise Exception("Number of workers must be at least 1: %d" % workers)
+    with zipfile.ZipFile(archive, "r") as zf:
+        members = [x for x in zf.infolist() if not x.is_dir()]
+    if (include is not None) and (len(include) > 0):
+        members = [x for x in members if _matches(x.filename, include)]
+    members = [x for x in members if not _matches(x.filename, exclude)]
+    if link_type is not None:
+        return extract_to_store(archive, output_dir, [(x, _member_path(output_dir, x.filename)) for x in members],
+                                workers, link_type=link_type)
+
+    local = threading.local()
+    handles = []
+    handles_lock = threading.Lock()
+
+    def extract(info: zipfile.ZipInfo) -> bool:
+        """
+        Extracts the member if necessary, using the thread's own handle on the archive.
+
+        :param info: the member to extract
+        :type info: zipfile.ZipInfo
+        :return: True if extracted, False if skipped
+        :rtype: bool
+        """
+        if _is_extracted(info, _member_path(output_dir, info.filename)):
+            return False
+        if not hasattr(local, "zf"):
+            local.zf = zipfile.ZipFile(archive, "r")
+            with handles_lock:
+                handles.append(local.zf)
+        with local.zf.open(info) as src, open(_member_path(output_dir, info.filename), "wb") as dest:
+            shutil.copyfileobj(src, dest, MAX_CHUNK_SIZE)
+        return True
+
+    # ZipFile.extract creates the directories itself, which races between threads
+    for dir_ in sorted(set(os.path.dirname(_member_path(output_dir, x.filename)) for x in members)):
+        os.makedirs(dir_, exist_ok=True)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(extract, members))
+    finally:
+        for handle in handles:
+            handle.close()
+    extracted = sum(1 for x in results if x)
+    return extracted, len(results) - extracted
+
+
+def download(version: str, name: str, output_dir: str, extract: bool, connections: int = DEFAULT_CONNECTIONS,
+             workers: int = DEFAULT_WORKERS, include: List[str] = None, exclude: List[str] = None,
+             link_type: str = None, index: str = DOWNLOADS_URL, ttl: float = DEFAULT_TTL, mirror: str = None):
     """
     Downloads the specified version.
 
@@ -96,36 +776,150 @@ def download(version: str, name: str, output_dir: str, extract: bool):
     :type output_dir: str
     :param extract: whether to extract the archive as well
     :type extract: bool
+    :param connections: the maximum number of parallel connections to use
+    :type connections: int
+    :param workers: the number of threads to use for extracting
+    :type workers: int
+    :param include: the glob patterns of the archive members to extract, all if None or empty
+    :type include: list
+    :param exclude: the glob patterns of the archive members to skip, none if None
+    :type exclude: list
+    :param link_type: the type of links to create when extracting via the content-addressed store, None for plain extraction
+    :type link_type: str
+    :param index: the URL or local path (or file:// URL) of the downloads information
+    :type index: str
+    :param ttl: the time in seconds after which to check for updated downloads information, negative for never
+    :type ttl: float
+    :param mirror: the local mirror directory to use instead of downloading (offline mode)
+    :type mirror: str
     """
-    info = _load_downloads()
+    info = _load_downloads(index=index, ttl=ttl, mirror=mirror)
     if info is None:
-        _logger.error("No downloads information available (%s), cannot perform download!" % _downloads_info_file())
+        _logger.error("No downloads information available, cannot perform download!")
         return
     if version not in info:
         _logger.error("Version '%s' not available!" % version)
-        list_downloads()
+        list_downloads(index=index, ttl=-1, mirror=mirror)
         return
     if name not in info[version]:
         _logger.error("Name '%s' not available for version '%s'!" % (name, version))
-        list_downloads()
+        list_downloads(index=index, ttl=-1, mirror=mirror)
         return
 
     # download
-    url = info[version][name]
-    _logger.info("Downloading: %s" % url)
-    local_filename = os.path.join(output_dir, url.split('/')[-1])
-    _logger.info("Local file: %s" % local_filename)
-    with requests.get(url, stream=True) as r:
-        r.raise_for_status()
-        with open(local_filename, 'wb') as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                f.write(chunk)
+    url, checksum = _download_entry(info[version][name])
+    local_filename = os.path.join(output_dir, _url_filename(url))
+    if mirror is not None:
+        mirror_file = _mirror_file(mirror, version, url)
+        if not os.path.exists(mirror_file):
+            raise Exception("Archive not available from mirror: %s" % mirror_file)
+        _logger.info("Copying '%s' to: %s" % (mirror_file, local_filename))
+        shutil.copyfile(mirror_file, local_filename)
+        if (checksum is not None) and (_sha256(local_filename).lower() != checksum.lower()):
+            raise Exception("Checksum mismatch for: %s" % mirror_file)
+    else:
+        download_file(url, local_filename, connections=connections, checksum=checksum)
 
     # extract?
     if extract:
         _logger.info("Extracting '%s' to: %s" % (local_filename, output_dir))
-        with zipfile.ZipFile(local_filename, 'r') as zip_ref:
-            zip_ref.extractall(output_dir)
+        extracted, skipped = extract_archive(local_filename, output_dir, workers=workers, include=include,
+                                             exclude=exclude, link_type=link_type)
+        if link_type is None:
+            _logger.info("Extracted %d file(s), skipped %d up-to-date file(s)" % (extracted, skipped))
+        else:
+            _logger.info("Stored %d new file(s), reused %d file(s) from store" % (extracted, skipped))
+
+
+def sync(patterns: List[str], output_dir: str, max_parallel: int = DEFAULT_PARALLEL,
+         connections: int = DEFAULT_CONNECTIONS, max_rate: float = None, index: str = DOWNLOADS_URL,
+         ttl: float = DEFAULT_TTL) -> List[Dict]:
+    """
+    Downloads all the artifacts matching the patterns concurrently into the output directory,
+    skipping the ones that are already up-to-date. The output directory is laid out as a
+    mirror directory, i.e., it receives a copy of the downloads information and the archives
+    are stored as VERSION/ARCHIVE.
+
+    :param patterns: the glob patterns for the 'version/name' pairs to download, e.g., 'snapshots/*'
+    :type patterns: list
+    :param output_dir: the mirror directory to download to
+    :type output_dir: str
+    :param max_parallel: the maximum number of artifacts to download concurrently
+    :type max_parallel: int
+    :param connections: the maximum number of parallel connections to use per artifact
+    :type connections: int
+    :param max_rate: the maximum combined bandwidth in bytes per second, None for unlimited
+    :type max_rate: float
+    :param index: the URL or local path (or file:// URL) of the downloads information
+    :type index: str
+    :param ttl: the time in seconds after which to check for updated downloads information, negative for never
+    :type ttl: float
+    :return: the summary per artifact (keys: artifact, status, bytes, seconds)
+    :rtype: list
+    """
+    if max_parallel < 1:
+        raise Exception("Maximum number of parallel downloads must be at least 1: %d" % max_parallel)
+    info = _load_downloads(index=index, ttl=ttl)
+    if info is None:
+        _logger.error("No downloads information available, cannot sync!")
+        return []
+    artifacts = []
+    for version in info:
+        for name in info[version]:
+            if _matches("%s/%s" % (version, name), patterns):
+                artifacts.append((version, name))
+    if len(artifacts) == 0:
+        _logger.warning("No artifacts matching: %s" % ", ".join(patterns))
+        return []
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(_mirror_index(output_dir), "w") as fp:
+        json.dump(info, fp, indent=2)
+    session = _new_session(max_parallel * connections)
+    limiter = None if ((max_rate is None) or (max_rate <= 0)) else RateLimiter(max_rate)
+
+    def fetch(artifact: Tuple[str, str]) -> Dict:
+        """
+        Downloads the artifact.
+
+        :param artifact: the version and name of the artifact
+        :type artifact: tuple
+        :return: the summary
+        :rtype: dict
+        """
+        version, name = artifact
+        url, checksum = _download_entry(info[version][name])
+        local_filename = _mirror_file(output_dir, version, url)
+        os.makedirs(os.path.dirname(local_filename), exist_ok=True)
+        result = {"artifact": "%s/%s" % (version, name), "status": "skipped", "bytes": 0, "seconds": 0.0}
+        start = time.time()
+        try:
+            result["bytes"] = download_file(url, local_filename, connections=connections, checksum=checksum,
+                                            session=session, limiter=limiter, skip_up_to_date=True)
+            if result["bytes"] > 0:
+                result["status"] = "downloaded"
+        except Exception as e:
+            _logger.error("Failed to download %s: %s" % (result["artifact"], str(e)))
+            result["status"] = "failed"
+        result["seconds"] = time.time() - start
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        return list(executor.map(fetch, artifacts))
+
+
+def _print_summary(summary: List[Dict]):
+    """
+    Prints the summary of a sync.
+
+    :param summary: the summary to print
+    :type summary: list
+    """
+    print("%-40s %-10s %10s %8s %8s" % ("artifact", "status", "MB", "seconds", "MB/s"))
+    for item in summary:
+        mb = item["bytes"] / 1024 / 1024
+        rate = (mb / item["seconds"]) if (item["seconds"] > 0) and (item["bytes"] > 0) else 0.0
+        print("%-40s %-10s %10.1f %8.1f %8.2f" % (item["artifact"], item["status"], mb, item["seconds"], rate))
 
 
 def main(args=None):
@@ -143,17 +937,43 @@ def main(args=None):
     parser.add_argument("-a", "--action", choices=ACTIONS, help="The action to perform.", default=None, type=str, required=True)
     parser.add_argument("-v", "--version", help="The version to download, e.g., 'snapshot'.", default=None, type=str, required=False)
     parser.add_argument("-n", "--name", help="The name of the download, e.g., 'adams-ml-app'.", default=None, type=str, required=False)
-    parser.add_argument("-o", "--output_dir", help="The directory to download ADAMS to.", default=None, type=str, required=False)
+    parser.add_argument("-p", "--pattern", metavar="GLOB", help="The glob pattern(s) of the 'version/name' pairs to sync, e.g., 'snapshots/*'.", default=None, type=str, required=False, nargs="*")
+    parser.add_argument("-o", "--output_dir", help="The directory to download ADAMS to (or the mirror directory when syncing).", default=None, type=str, required=False)
+    parser.add_argument("-c", "--connections", metavar="NUM", help="The maximum number of parallel connections to use per download.", default=DEFAULT_CONNECTIONS, type=int, required=False)
+    parser.add_argument("--max_parallel", metavar="NUM", help="The maximum number of artifacts to download concurrently when syncing.", default=DEFAULT_PARALLEL, type=int, required=False)
+    parser.add_argument("--max_rate", metavar="BYTES", help="The maximum combined bandwidth in bytes per second when syncing, unlimited if not specified.", default=None, type=float, required=False)
     parser.add_argument("-x", "--extract", action="store_true", help="Whether to automatically extract the downloaded ADAMS archive.", required=False)
+    parser.add_argument("-w", "--workers", metavar="NUM", help="The number of threads to use for extracting the archive.", default=DEFAULT_WORKERS, type=int, required=False)
+    parser.add_argument("-i", "--include", metavar="GLOB", help="The glob pattern(s) of the archive members to extract ('*' does not match '/', '**' does), e.g., '*/lib/*.jar'.", default=None, type=str, required=False, nargs="*")
+    parser.add_argument("-e", "--exclude", metavar="GLOB", help="The glob pattern(s) of the archive members to skip when extracting.", default=None, type=str, required=False, nargs="*")
+    parser.add_argument("--libs_only", action="store_true", help="Whether to only extract the jars and the platform-specific libraries required for running ADAMS from Python.", required=False)
+    parser.add_argument("-s", "--store", choices=LINK_TYPES, help="Extracts into the content-addressed store under the project directory and populates the output directory with the specified type of links.", default=None, type=str, required=False)
+    parser.add_argument("--index", metavar="URL_OR_FILE", help="The URL, file:// URL or local file of the downloads information.", default=DOWNLOADS_URL, type=str, required=False)
+    parser.add_argument("--ttl", metavar="SECONDS", help="The time after which to check for updated downloads information, use -1 to never check automatically.", default=DEFAULT_TTL, type=float, required=False)
+    parser.add_argument("-m", "--mirror", metavar="DIR", help="The local mirror directory to use instead of downloading (offline mode), containing 'downloads.json' and 'VERSION/ARCHIVE' files.", default=None, type=str, required=False)
     add_logging_level(parser)
     parsed = parser.parse_args(args=args)
     set_logging_level(_logger, parsed.logging_level)
     if parsed.action == ACTION_UPDATE:
-        update_downloads_info()
+        update_downloads_info(index=parsed.index)
     elif parsed.action == ACTION_LIST:
-        list_downloads()
+        list_downloads(index=parsed.index, ttl=parsed.ttl, mirror=parsed.mirror)
     elif parsed.action == ACTION_DOWNLOAD:
-        download(parsed.version, parsed.name, parsed.output_dir, parsed.extract)
+        include = parsed.include
+        if parsed.libs_only:
+            include = ([] if (include is None) else include) + lib_patterns()
+        download(parsed.version, parsed.name, parsed.output_dir, parsed.extract, connections=parsed.connections,
+                 workers=parsed.workers, include=include, exclude=parsed.exclude, link_type=parsed.store,
+                 index=parsed.index, ttl=parsed.ttl, mirror=parsed.mirror)
+    elif parsed.action == ACTION_SYNC:
+        if (parsed.pattern is None) or (len(parsed.pattern) == 0):
+            raise Exception("No pattern(s) specified for sync!")
+        summary = sync(parsed.pattern, parsed.output_dir, max_parallel=parsed.max_parallel,
+                       connections=parsed.connections, max_rate=parsed.max_rate, index=parsed.index, ttl=parsed.ttl)
+        _print_summary(summary)
+    elif parsed.action == ACTION_GC:
+        removed, freed = collect_garbage()
+        _logger.info("Removed %d unreferenced file(s), freed %d bytes" % (removed, freed))
     else:
         raise Exception("Unknown action: %s" % parsed.action)
 
@@ -0,0 +1,348 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import stat
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from pyadams.core.project import project_dir
+
+_logger = logging.getLogger("pa-download")
+
+LINK_HARD = "hard"
+LINK_SYMBOLIC = "symbolic"
+LINK_TYPES = [
+    LINK_HARD,
+    LINK_SYMBOLIC,
+]
+
+CHUNK_SIZE = 1024 * 1024
+""" the chunk size to use when reading archive members. """
+
+
+def store_dir() -> str:
+    """
+    Returns the directory of the content-addressed store.
+
+    :return: the directory
+    :rtype: str
+    """
+    return os.path.join(project_dir(), "store")
+
+
+def _blobs_dir() -> str:
+    """
+    Returns the directory with the blobs.
+
+    :return: the directory
+    :rtype: str
+    """
+    return os.path.join(store_dir(), "blobs")
+
+
+def _blob_path(digest: str) -> str:
+    """
+    Returns the path of the blob with the specified SHA-256 digest.
+
+    :param digest: the hex digest
+    :type digest: str
+    :return: the path
+    :rtype: str
+    """
+    return os.path.join(_blobs_dir(), digest[:2], digest)
+
+
+def _index_file() -> str:
+    """
+    Returns the file that maps the archive members (CRC32 and size) to blobs.
+
+    :return: the file
+    :rtype: str
+    """
+    return os.path.join(store_dir(), "index.json")
+
+
+def _registry_file() -> str:
+    """
+    Returns the file that lists the directories linked to the store.
+
+    :return: the file
+    :rtype: str
+    """
+    return os.path.join(store_dir(), "versions.json")
+
+
+def _load_json(path: str, default):
+    """
+    Loads the JSON file, returns the default value if not present.
+
+    :param path: the file to load
+    :type path: str
+    :param default: the value to return if the file does not exist
+    :return: the loaded data
+    """
+    if not os.path.exists(path):
+        return default
+    with open(path, "r") as fp:
+        return json.load(fp)
+
+
+def _save_json(path: str, data):
+    """
+    Saves the data as JSON file, replacing the file atomically.
+
+    :param path: the file to save to
+    :type path: str
+    :param data: the data to save
+    """
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w") as fp:
+        json.dump(data, fp, indent=2)
+    os.replace(tmp_file, path)
+
+
+def _member_key(info: zipfile.ZipInfo) -> str:
+    """
+    Generates the key for looking up an archive member in the index.
+
+    :param info: the archive member
+    :type info: zipfile.ZipInfo
+    :return: the key
+    :rtype: str
+    """
+    return "%08x-%d" % (info.CRC, info.file_size)
+
+
+def _link(blob: str, target: str, link_type: str):
+    """
+    Links the target to the blob. Falls back to a symbolic link if a hard link is not
+    possible (e.g., different file systems) and to a copy if symbolic links are not possible either.
+
+    :param blob: the blob to link to
+    :type blob: str
+    :param target: the path of the link
+    :type target: str
+    :param link_type: the type of link to create, see LINK_TYPES
+    :type link_type: str
+    """
+    if os.path.lexists(target):
+        if os.path.exists(target) and os.path.samefile(target, blob):
+            return
+        os.remove(target)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if link_type == LINK_HARD:
+        try:
+            os.link(blob, target)
+            return
+        except OSError:
+            _logger.debug("Failed to create hard link, falling back on symbolic link: %s" % target)
+    try:
+        os.symlink(blob, target)
+    except OSError:
+        _logger.debug("Failed to create symbolic link, falling back on copy: %s" % target)
+        shutil.copyfile(blob, target)
+
+
+def _member_digest(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> str:
+    """
+    Computes the SHA-256 digest of the archive member's content, without writing it to disk.
+
+    :param zf: the archive to read from
+    :type zf: zipfile.ZipFile
+    :param info: the member to compute the digest for
+    :type info: zipfile.ZipInfo
+    :return: the SHA-256 hex digest
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    with zf.open(info, "r") as src:
+        while True:
+            data = src.read(CHUNK_SIZE)
+            if len(data) == 0:
+                break
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def _store_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> str:
+    """
+    Stores the archive member as blob and returns its digest.
+
+    :param zf: the archive to read from
+    :type zf: zipfile.ZipFile
+    :param info: the member to store
+    :type info: zipfile.ZipInfo
+    :return: the SHA-256 hex digest
+    :rtype: str
+    """
+    tmp_dir = os.path.join(store_dir(), "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_file = os.path.join(tmp_dir, uuid.uuid4().hex)
+    digest = hashlib.sha256()
+    try:
+        with zf.open(info, "r") as src, open(tmp_file, "wb") as dst:
+            while True:
+                data = src.read(CHUNK_SIZE)
+                if len(data) == 0:
+                    break
+                digest.update(data)
+                dst.write(data)
+        result = digest.hexdigest()
+        blob = _blob_path(result)
+        if os.path.exists(blob):
+            os.remove(tmp_file)
+        else:
+            # blobs are shared between versions, therefore read-only
+            mode = (info.external_attr >> 16) & 0o777
+            if mode == 0:
+                mode = 0o644
+            os.chmod(tmp_file, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            os.replace(tmp_file, blob)
+        return result
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def register(output_dir: str):
+    """
+    Registers the directory as being linked to the store.
+
+    :param output_dir: the directory to register
+    :type output_dir: str
+    """
+    os.makedirs(store_dir(), exist_ok=True)
+    registry = _load_json(_registry_file(), [])
+    path = os.path.abspath(output_dir)
+    if path not in registry:
+        registry.append(path)
+        _save_json(_registry_file(), registry)
+
+
+def extract_to_store(archive: str, output_dir: str, members: List[Tuple[zipfile.ZipInfo, str]], workers: int,
+                     link_type: str = LINK_HARD) -> Tuple[int, int]:
+    """
+    Extracts the archive members into the content-addressed store and links them into the output directory.
+    Members whose content is already present in the store do not get written again. The index (CRC32 and
+    size) only supplies a candidate blob, which only gets reused if the SHA-256 of the member's content
+    matches, as CRC32 and size may collide.
+
+    :param archive: the zip file to extract
+    :type archive: str
+    :param output_dir: the directory to create the links in (gets registered with the store)
+    :type output_dir: str
+    :param members: the archive members to extract, tuples of member and path of the link
+    :type members: list
+    :param workers: the number of threads to use
+    :type workers: int
+    :param link_type: the type of links to create, see LINK_TYPES
+    :type link_type: str
+    :return: the number of newly stored and reused blobs
+    :rtype: tuple
+    """
+    if link_type not in LINK_TYPES:
+        raise Exception("Unsupported link type: %s" % link_type)
+    os.makedirs(store_dir(), exist_ok=True)
+    index = _load_json(_index_file(), dict())
+    index_lock = threading.Lock()
+    local = threading.local()
+    handles = []
+
+    def process(member: Tuple[zipfile.ZipInfo, str]) -> bool:
+        """
+        Stores the member if necessary and links it into the output directory.
+
+        :param member: the member to process and the path of the link
+        :type member: tuple
+        :return: True if stored, False if reused
+        :rtype: bool
+        """
+        info, target = member
+        key = _member_key(info)
+        with index_lock:
+            digest = index.get(key, None)
+        if not hasattr(local, "zf"):
+            local.zf = zipfile.ZipFile(archive, "r")
+            with index_lock:
+                handles.append(local.zf)
+        if (digest is not None) and os.path.exists(_blob_path(digest)) and (_member_digest(local.zf, info) != digest):
+            _logger.warning("CRC32/size collision with blob %s, storing separately: %s" % (digest, info.filename))
+            digest = None
+        stored = False
+        if (digest is None) or not os.path.exists(_blob_path(digest)):
+            digest = _store_member(local.zf, info)
+            with index_lock:
+                index[key] = digest
+            stored = True
+        _link(_blob_path(digest), target, link_type)
+        return stored
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(process, members))
+    finally:
+        for handle in handles:
+            handle.close()
+        with index_lock:
+            _save_json(_index_file(), index)
+    register(output_dir)
+    stored = sum(1 for x in results if x)
+    return stored, len(results) - stored
+
+
+def collect_garbage(dry_run: bool = False) -> Tuple[int, int]:
+    """
+    Removes all blobs from the store that are no longer referenced by any of the registered
+    directories. Directories that no longer exist get removed from the registry.
+
+    :param dry_run: whether to only determine the unreferenced blobs without removing them
+    :type dry_run: bool
+    :return: the number of removed blobs and the number of bytes freed
+    :rtype: tuple
+    """
+    if not os.path.exists(_blobs_dir()):
+        return 0, 0
+
+    # determine references
+    registry = [x for x in _load_json(_registry_file(), []) if os.path.isdir(x)]
+    inodes = set()
+    targets = set()
+    for path in registry:
+        for root, dirs, files in os.walk(path):
+            for f in files:
+                full = os.path.join(root, f)
+                if os.path.islink(full):
+                    targets.add(os.path.realpath(full))
+                elif os.path.isfile(full):
+                    st = os.stat(full)
+                    inodes.add((st.st_dev, st.st_ino))
+
+    # remove unreferenced blobs
+    removed = 0
+    freed = 0
+    digests = set()
+    for root, dirs, files in os.walk(_blobs_dir()):
+        for f in files:
+            blob = os.path.join(root, f)
+            st = os.stat(blob)
+            if ((st.st_dev, st.st_ino) in inodes) or (os.path.realpath(blob) in targets):
+                digests.add(f)
+                continue
+            _logger.info("Unreferenced blob: %s" % blob)
+            removed += 1
+            freed += st.st_size
+            if not dry_run:
+                os.remove(blob)
+
+    if not dry_run:
+        index = _load_json(_index_file(), dict())
+        _save_json(_index_file(), {k: v for k, v in index.items() if v in digests})
+        _save_json(_registry_file(), registry)
+    return removed, freed
+
@@ -0,0 +1,94 @@
+"""
+Regression tests for closing pyadams.core.shm.SharedArray while the memory is still referenced.
+The storage tests require an ADAMS installation, supplied via the ADAMS_DIR environment variable.
+
+Usage:
+
+    PYTHONPATH=src python -m unittest discover -s tests
+"""
+import os
+import unittest
+
+import numpy as np
+
+from pyadams.core.shm import SharedArray
+
+ADAMS_DIR = os.environ.get("ADAMS_DIR", None)
+""" the ADAMS installation to use for the storage tests. """
+
+
+class TestSharedArrayClose(unittest.TestCase):
+
+    def test_refuses_while_array_referenced(self):
+        shared = SharedArray.from_array(np.arange(10.0))
+        try:
+            array = shared.array
+            self.assertRaises(Exception, shared.close)
+            self.assertFalse(shared.closed)
+            self.assertEqual(45.0, array.sum())
+            del array
+            shared.close()
+            self.assertTrue(shared.closed)
+        finally:
+            shared.unlink()
+
+    def test_refuses_while_view_referenced(self):
+        shared = SharedArray.create((1000000,))
+        try:
+            view = shared.array[1:]
+            self.assertRaises(Exception, shared.close)
+            self.assertFalse(shared.closed)
+            self.assertEqual(0.0, view.sum())
+            del view
+            shared.close()
+            self.assertTrue(shared.closed)
+            self.assertRaises(Exception, lambda: shared.array)
+        finally:
+            shared.unlink()
+
+    def test_context_manager(self):
+        with SharedArray.from_array(np.ones(5)) as shared:
+            self.assertEqual(5.0, shared.array.sum())
+        self.assertTrue(shared.closed)
+
+
+@unittest.skipIf(ADAMS_DIR is None, "ADAMS_DIR not set")
+class TestSharedArrayStorage(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        import pyadams.core.jvm as jvm
+        jvm.start(ADAMS_DIR, headless=True)
+
+    def test_removes_storage_item(self):
+        from pyadams.flow import Actor
+        flow = Actor(classname="adams.flow.control.Flow")
+        shared = SharedArray.from_array(np.arange(10.0))
+        try:
+            shared.put_in_storage(flow, "data")
+            self.assertIn("data", flow.get_storage(convert=False))
+            shared.close()
+            self.assertTrue(shared.closed)
+            self.assertNotIn("data", flow.get_storage(convert=False))
+        finally:
+            shared.unlink()
+
+    def test_refuses_while_storage_item_referenced(self):
+        from pyadams.flow import Actor
+        flow = Actor(classname="adams.flow.control.Flow")
+        shared = SharedArray.from_array(np.arange(10.0))
+        try:
+            shared.put_in_storage(flow, "data")
+            buffer = flow.get_storage(["data"], convert=False)["data"]
+            self.assertRaises(Exception, shared.close)
+            self.assertFalse(shared.closed)
+            self.assertEqual(9.0, buffer.asDoubleBuffer().get(9))
+            del buffer
+            shared.close()
+            self.assertTrue(shared.closed)
+        finally:
+            shared.unlink()
+
+
+if __name__ == "__main__":
+    unittest.main()